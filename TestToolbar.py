@@ -243,7 +243,7 @@ class VerticalCommandBar:
         if not self.use_alpha_transparency: self._draw_bar_background()
         content_bg=BAR_BG_COLOR if not self.use_alpha_transparency else self.bar_canvas.cget('bg'); self.content_frame=tk.Frame(self.bar_canvas,bg=content_bg)
 
-        self.processes={}; self.icon_widgets={}; self._icon_photo_refs=[]
+        self.processes={}; self.switched_on=set(); self.icon_widgets={}; self._icon_photo_refs=[]
         for cmd_data in self.commands:
              icon_canvas_width=self.bar_width-(2*BAR_PADDING_HORIZONTAL)
              icon=CommandIcon(self.content_frame,icon_canvas_width,ICON_CANVAS_HEIGHT,
@@ -346,6 +346,7 @@ class VerticalCommandBar:
     def toggle_command(self, name): # Unchanged (uses corrected syntax)
         icon_widget=self.icon_widgets.get(name); command_details=self.get_command_details(name)
         if not icon_widget or not command_details: print(f"Error: Could not find details for command '{name}'"); return
+        if "stop_command" in command_details: self.toggle_switch(name, icon_widget, command_details); return
         command_str=command_details["command"]; is_currently_on=name in self.processes
         if not is_currently_on:
             try:
@@ -362,6 +363,29 @@ class VerticalCommandBar:
             else: print(f"Warning: Could not confirm stopping process for '{name}' (PID: {pid}).")
             if name in self.processes: del self.processes[name]
             icon_widget.set_state(False)
+            # Switches selecting something inside the stopped process are off with it
+            for cmd in self.commands:
+                if cmd.get("group")==name and cmd["name"] in self.switched_on: self.set_switch(cmd["name"], False)
+    def toggle_switch(self, name, icon_widget, command_details):
+        # Switch entries run a short command to turn on and their "stop_command" to turn off; at most one switch
+        # of a "group" is on, as turning one on replaces the selection made by the others
+        is_currently_on=name in self.switched_on
+        command_str=command_details["stop_command"] if is_currently_on else command_details["command"]
+        try:
+            kwargs={}
+            if platform.system()=="Windows": kwargs['creationflags']=subprocess.CREATE_NEW_PROCESS_GROUP
+            subprocess.Popen(command_str,shell=True,**kwargs); print(f"{'Switched off' if is_currently_on else 'Switched on'}: '{name}'")
+        except Exception as e: print(f"Error running '{name}': {e}"); return
+        if not is_currently_on:
+            group=command_details.get("group")
+            for cmd in self.commands:
+                if group is not None and cmd.get("group")==group and cmd["name"] in self.switched_on: self.set_switch(cmd["name"], False)
+        self.set_switch(name, not is_currently_on)
+    def set_switch(self, name, is_on):
+        if is_on: self.switched_on.add(name)
+        else: self.switched_on.discard(name)
+        icon_widget=self.icon_widgets.get(name)
+        if icon_widget: icon_widget.set_state(is_on)
     def kill_process_tree(self, pid): # Unchanged
         try:
             parent=psutil.Process(pid); children=parent.children(recursive=True); procs_to_kill=children+[parent]
@@ -7,8 +7,24 @@ import keyboard
 import pyperclip
 from typing import Dict, List, Optional
 import logging
+import queue
+import statistics
+import threading
+import uuid
+from collections import deque
 from dataclasses import dataclass
 
+# Longest wait, in seconds, for the editor to put the selection on the clipboard
+DEFAULT_COPY_TIMEOUT = 0.5
+# Interval, in seconds, between two clipboard checks while waiting for the copy
+COPY_POLL_INTERVAL = 0.005
+# Copy round-trips kept per macro for the latency report
+LATENCY_HISTORY = 200
+# Macros waiting to run; further hotkey presses are dropped while the queue is full
+DISPATCH_QUEUE_SIZE = 4
+# Seconds given to the editor to paste a macro's result before the next macro touches the clipboard
+PASTE_SETTLE_DELAY = 0.15
+
 
 @dataclass
 class HotkeyBinding:
@@ -16,6 +32,7 @@ class HotkeyBinding:
     key_combination: str
     description: str
     category: str
+    copy_timeout: float = DEFAULT_COPY_TIMEOUT
 
 
 import time
@@ -26,29 +43,66 @@ class LaTeXMacro(ABC):
 
     def __init__(self, hotkey_binding: HotkeyBinding):
         self.hotkey_binding = hotkey_binding
+        # Seconds from ctrl+c to the selection reaching the clipboard
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+        self.timeouts = 0
 
     def get_selected_text(self) -> str:
-        """Get currently selected text using clipboard"""
+        """
+        Get currently selected text using clipboard.
+
+        A unique marker is put on the clipboard before sending ctrl+c, and
+        the clipboard is polled until the editor replaces it, so the wait
+        lasts as long as the editor needs and no longer. Selecting text equal
+        to the previous clipboard content is detected too. Nothing is selected
+        if the marker is still there after the binding's copy_timeout.
+        """
         previous_clipboard = pyperclip.paste()
+        marker = f"latex-macro-{uuid.uuid4()}"
+        pyperclip.copy(marker)
+        start = time.perf_counter()
         keyboard.send('ctrl+c')
-        # Use time.sleep instead of keyboard.wait
-        time.sleep(0.15)
-        selected_text = pyperclip.paste()
+        deadline = start + self.hotkey_binding.copy_timeout
+        while True:
+            selected_text = pyperclip.paste()
+            now = time.perf_counter()
+            if selected_text != marker or now >= deadline:
+                break
+            time.sleep(COPY_POLL_INTERVAL)
         pyperclip.copy(previous_clipboard)
 
-        if selected_text == previous_clipboard:
+        if selected_text == marker:
+            self.timeouts += 1
             return ''
+        # Measured when the copy was seen, without restoring the clipboard
+        self.latencies.append(now - start)
         return selected_text
 
-    def execute(self) -> None:
-        """Execute the macro on selected text"""
+    def latency_summary(self) -> str:
+        """Describe the copy round-trips measured so far, to tune copy_timeout."""
+        if not self.latencies:
+            return f"no copies measured, {self.timeouts} timeout(s)"
+        latencies = sorted(self.latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return (f"{len(latencies)} copies, median {statistics.median(latencies) * 1000:.0f} ms, "
+                f"p95 {p95 * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms, "
+                f"{self.timeouts} timeout(s) at {self.hotkey_binding.copy_timeout * 1000:.0f} ms")
+
+    def execute(self) -> bool:
+        """
+        Execute the macro on selected text.
+
+        Returns:
+            Whether the result was pasted; the editor reads the clipboard
+            some time after ctrl+v was sent
+        """
         text = self.get_selected_text()
         if text and text != '':
             result = self.apply(text)
             pyperclip.copy(result)
             keyboard.send('ctrl+v')
-            # Add a small delay after pasting
-            #time.sleep(0.1)
+            return True
+        return False
 
 
 class CommandMacro(LaTeXMacro):
@@ -87,12 +141,72 @@ class DisplayMathMacro(LaTeXMacro):
         return f"\$${text}\$$"
 
 
+class MacroDispatcher:
+    """
+    Run macros one after another on a single worker thread.
+
+    Hotkey callbacks only enqueue the macro and return, so the keyboard hook
+    is never blocked by a macro, and the clipboard save/restore sequences of
+    two macros never overlap. A macro already waiting in the queue is not
+    queued again, so a held or repeated hotkey runs it once, and presses
+    arriving while the queue is full are dropped. After a macro pasted its
+    result, the worker waits paste_settle_delay before the next one, so the
+    editor reads the pasted text before the next macro's marker replaces it.
+    """
+
+    def __init__(self, logger: logging.Logger, max_pending: int = DISPATCH_QUEUE_SIZE,
+                 paste_settle_delay: float = PASTE_SETTLE_DELAY):
+        self.logger = logger
+        self.paste_settle_delay = paste_settle_delay
+        self._queue: "queue.Queue[Optional[LaTeXMacro]]" = queue.Queue(maxsize=max_pending)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="MacroDispatcher", daemon=True)
+
+    def start(self) -> None:
+        """Start the worker thread"""
+        self._thread.start()
+
+    def submit(self, macro: LaTeXMacro) -> None:
+        """Queue a macro without blocking; called on the keyboard hook thread"""
+        with self._lock:
+            if id(macro) in self._pending:
+                return
+            try:
+                self._queue.put_nowait(macro)
+            except queue.Full:
+                self.logger.warning(f"Dropped {macro.hotkey_binding.description}: too many macros pending")
+                return
+            self._pending.add(id(macro))
+
+    def _run(self) -> None:
+        while True:
+            macro = self._queue.get()
+            if macro is None:
+                return
+            with self._lock:
+                self._pending.discard(id(macro))
+            try:
+                pasted = macro.execute()
+            except Exception as e:
+                self.logger.error(f"{macro.hotkey_binding.description} failed: {str(e)}")
+                continue
+            if pasted:
+                time.sleep(self.paste_settle_delay)
+
+    def stop(self) -> None:
+        """Let the queued macros finish and stop the worker thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+
 class LaTeXHotkeyManager:
     """Manages LaTeX hotkeys and macros"""
 
     def __init__(self):
         self.macros: Dict[str, LaTeXMacro] = {}
         self.setup_logging()
+        self.dispatcher = MacroDispatcher(self.logger)
         self.register_default_macros()
 
     def setup_logging(self):
@@ -108,7 +222,8 @@ class LaTeXHotkeyManager:
         try:
             keyboard.add_hotkey(
                 macro.hotkey_binding.key_combination,
-                macro.execute
+                self.dispatcher.submit,
+                args=(macro,)
             )
             self.macros[macro.hotkey_binding.key_combination] = macro
             self.logger.info(
@@ -175,12 +290,25 @@ class LaTeXHotkeyManager:
                 print(f"  {macro.hotkey_binding.key_combination}: "
                       f"{macro.hotkey_binding.description}")
 
+    def print_latency_report(self):
+        """Print the copy latency of every macro that was used"""
+        used = [macro for macro in self.macros.values() if macro.latencies or macro.timeouts]
+        if not used:
+            return
+        print("\nCopy latency:")
+        for macro in used:
+            print(f"  {macro.hotkey_binding.description}: {macro.latency_summary()}")
+
     def start(self):
         """Start the hotkey listener"""
         self.logger.info("LaTeX Hotkey Manager started")
         self.print_available_hotkeys()
         print("\nPress ESC to exit")
+        self.dispatcher.start()
         keyboard.wait('esc')
+        keyboard.unhook_all_hotkeys()
+        self.dispatcher.stop()
+        self.print_latency_report()
 
 
 def main():
@@ -9,9 +9,14 @@ setup(
         "pyperclip",
         "watchdog",
     ],
+    extras_require={
+        "preprocess": ["numpy"],
+    },
     entry_points={
         "console_scripts": [
             "image-clipboard=university_student_tools.clipboard.image_clipboard:main",
+            "clipboard-router=university_student_tools.clipboard.router:main",
+            "image-drop=university_student_tools.clipboard.file_drop:main",
             "copy-files=university_student_tools.file_manager.copy_files:main",
         ],
     },
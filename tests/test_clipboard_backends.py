@@ -0,0 +1,87 @@
+import asyncio
+import io
+
+import pyperclip
+import pytest
+from PIL import Image
+
+from university_student_tools.clipboard import image_clipboard, image_index
+from university_student_tools.clipboard.backends import ClipboardWatcher, FakeBackend
+
+
+def png_image(color):
+    """Build a clipboard-like image, decoded from PNG data."""
+    data = io.BytesIO()
+    Image.new("RGB", (16, 16), color).save(data, format="PNG")
+    data.seek(0)
+    return Image.open(data)
+
+
+def test_watcher_decodes_only_after_a_change():
+    backend = FakeBackend()
+    watcher = ClipboardWatcher(backend)
+    image = png_image("red")
+    backend.set_image(image)
+
+    assert watcher.poll() is image
+    assert watcher.poll() is None
+    assert watcher.poll() is None
+    assert backend.grab_count == 1
+
+    backend.set_files(["/tmp/a.png"])
+    assert watcher.poll() == ["/tmp/a.png"]
+    assert backend.grab_count == 2
+
+
+def test_watch_clipboard_saves_captures_copied_in_quick_succession(tmp_path, monkeypatch):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    monkeypatch.setattr(image_index, "STATE_DIR", str(tmp_path / "state"))
+    copied = []
+    monkeypatch.setattr(pyperclip, "copy", copied.append)
+    backend = FakeBackend()
+
+    async def capture_two_images():
+        monitor = asyncio.ensure_future(image_clipboard.watch_clipboard(str(folder), interval=0.05,
+                                                                        backend=backend))
+        await asyncio.sleep(0.2)
+        backend.set_image(png_image("red"))
+        await asyncio.sleep(0.3)
+        backend.set_image(png_image("blue"))
+        await asyncio.sleep(0.3)
+        monitor.cancel()
+        try:
+            await monitor
+        except asyncio.CancelledError:
+            pass
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(capture_two_images())
+    finally:
+        loop.close()
+
+    assert (folder / "image1.png").is_file()
+    assert (folder / "image2.png").is_file()
+    # The clipboard held at start, then one decode per capture
+    assert backend.grab_count == 3
+    assert "images/image2.png" in copied[-1]
+
+
+def test_watcher_retries_a_change_whose_grab_failed():
+    class BusyOnceBackend(FakeBackend):
+        def grab(self):
+            if self.grab_count == 0:
+                self.grab_count += 1
+                raise OSError("failed to open clipboard")
+            return super().grab()
+
+    backend = BusyOnceBackend()
+    watcher = ClipboardWatcher(backend)
+    image = png_image("green")
+    backend.set_image(image)
+
+    with pytest.raises(OSError):
+        watcher.poll()
+    assert watcher.poll() is image
+    assert watcher.poll() is None
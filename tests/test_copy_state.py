@@ -0,0 +1,70 @@
+import os
+import shutil
+import threading
+
+import pytest
+
+from university_student_tools.file_manager.copy_engine import resumable_copy, resume_paths
+from university_student_tools.file_manager.debounce import EventDebouncer
+from university_student_tools.file_manager.manifest import CopyManifest
+
+
+def test_debouncer_fires_once_per_burst():
+    fired = []
+    flushed = threading.Event()
+
+    def callback(key, last_event):
+        fired.append(key)
+        flushed.set()
+
+    debouncer = EventDebouncer(callback, quiet_period=0.1)
+    debouncer.start()
+    for _ in range(5):
+        debouncer.touch("lecture.mp4")
+    assert flushed.wait(2)
+    debouncer.touch("notes.txt")
+    debouncer.stop(flush=True)
+
+    assert fired == ["lecture.mp4", "notes.txt"]
+    assert debouncer.pending_count == 0
+
+
+def test_manifest_adopts_copies_made_before_it_existed(tmp_path):
+    source = tmp_path / "slides.pdf"
+    source.write_bytes(b"slides")
+    copied = tmp_path / "copied.pdf"
+    shutil.copy2(str(source), str(copied))
+    rewritten = tmp_path / "rewritten.pdf"
+    rewritten.write_bytes(b"slides")
+    os.utime(str(rewritten), ns=(0, source.stat().st_mtime_ns - 10 ** 9))
+
+    manifest = CopyManifest(str(tmp_path / "manifest.json"))
+    assert manifest.is_current("slides.pdf", str(source), str(copied))
+    assert "slides.pdf" in manifest.entries
+    manifest.forget("slides.pdf")
+    assert not manifest.is_current("slides.pdf", str(source), str(rewritten))
+    assert "slides.pdf" not in manifest.entries
+
+
+def test_resumable_copy_continues_after_an_interruption(tmp_path):
+    source = tmp_path / "recording.mp4"
+    data = os.urandom(10 * 1024)
+    source.write_bytes(data)
+    destination = tmp_path / "out" / "recording.mp4"
+    destination.parent.mkdir()
+
+    def interrupt(copied, total):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        resumable_copy(str(source), str(destination), chunk_size=1024, checkpoint_chunks=3,
+                       progress=interrupt)
+    partial, sidecar = resume_paths(str(destination))
+    assert os.path.getsize(partial) == 3 * 1024
+    assert not destination.exists()
+
+    assert resumable_copy(str(source), str(destination), chunk_size=1024, checkpoint_chunks=3) == \
+        "chunked (resumed)"
+    assert destination.read_bytes() == data
+    assert not os.path.exists(partial)
+    assert not os.path.exists(sidecar)
@@ -0,0 +1,50 @@
+import threading
+import time
+
+from university_student_tools.file_manager.workers import CopyWorkerPool
+
+
+def test_jobs_with_the_same_key_run_in_submission_order():
+    pool = CopyWorkerPool(workers=4)
+    pool.start()
+    order = []
+    running = []
+    overlaps = []
+
+    def job(i):
+        running.append(i)
+        if len(running) > 1:
+            overlaps.append(list(running))
+        time.sleep(0.001 * (i % 3))
+        order.append(i)
+        running.remove(i)
+
+    for i in range(20):
+        pool.submit("same-file", job, i)
+    pool.stop()
+
+    assert order == list(range(20))
+    assert overlaps == []
+
+
+def test_a_slow_job_only_holds_up_its_own_key():
+    pool = CopyWorkerPool(workers=2)
+    pool.start()
+    release = threading.Event()
+    done = []
+
+    pool.submit("recording.mp4", release.wait, 5)
+    pool.submit("recording.mp4", done.append, "recording.mp4")
+    for i in range(5):
+        pool.submit(f"notes{i}.txt", done.append, f"notes{i}.txt")
+
+    deadline = time.monotonic() + 5
+    while len(done) < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sorted(done) == [f"notes{i}.txt" for i in range(5)]
+    assert pool.active_count == 1
+
+    release.set()
+    pool.stop()
+    assert done[-1] == "recording.mp4"
+    assert not pool.is_alive()
@@ -0,0 +1,97 @@
+import os
+
+from watchdog.events import (FileCreatedEvent, FileDeletedEvent, FileModifiedEvent, FileMovedEvent,
+                             FileSystemEventHandler)
+
+from university_student_tools.file_manager.polling import SnapshotPoller
+
+
+class RecordingHandler(FileSystemEventHandler):
+    def __init__(self):
+        self.events = []
+
+    def dispatch(self, event):
+        self.events.append(event)
+
+
+def write(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def start_without_thread(poller):
+    """Take the initial snapshot; the test calls poll() itself."""
+    poller.start()
+    poller.stop()
+    poller.join()
+
+
+def poll_passes(poller, count):
+    """Poll until count full passes over the tree have completed."""
+    for _ in range(count * (poller.entry_count + len(poller._index)) + 1):
+        poller.poll()
+
+
+def summary(events, root):
+    return sorted(
+        (type(event).__name__, os.path.relpath(event.src_path, root),
+         os.path.relpath(event.dest_path, root) if isinstance(event, FileMovedEvent) else None)
+        for event in events
+    )
+
+
+def test_flat_folder_read_over_several_polls(tmp_path):
+    for i in range(10):
+        write(str(tmp_path / f"file{i}.txt"), "x")
+    handler = RecordingHandler()
+    poller = SnapshotPoller(handler, str(tmp_path), max_entries=3)
+    start_without_thread(poller)
+
+    write(str(tmp_path / "new.txt"), "new")
+    write(str(tmp_path / "file3.txt"), "longer content")
+    os.remove(str(tmp_path / "file7.txt"))
+
+    poller.poll()
+    # Deletions are only known once the whole folder has been read
+    assert not any(isinstance(event, FileDeletedEvent) for event in handler.events)
+    poll_passes(poller, 2)
+
+    assert summary(handler.events, str(tmp_path)) == [
+        ("FileCreatedEvent", "new.txt", None),
+        ("FileDeletedEvent", "file7.txt", None),
+        ("FileModifiedEvent", "file3.txt", None),
+    ]
+    assert poller.entry_count == 10
+
+
+def test_move_within_a_folder_read_in_one_poll_of_a_split_pass(tmp_path):
+    big = tmp_path / "big"
+    big.mkdir()
+    for i in range(10):
+        write(str(big / f"file{i}.txt"), "x")
+    write(str(tmp_path / "draft.tex"), "x")
+    handler = RecordingHandler()
+    # The top folder fits in the first poll, "big" takes the next ones
+    poller = SnapshotPoller(handler, str(tmp_path), recursive=True, max_entries=5)
+    start_without_thread(poller)
+
+    os.rename(str(tmp_path / "draft.tex"), str(tmp_path / "final.tex"))
+    poll_passes(poller, 2)
+
+    assert summary(handler.events, str(tmp_path)) == [("FileMovedEvent", "draft.tex", "final.tex")]
+
+
+def test_files_in_a_new_folder_are_reported(tmp_path):
+    handler = RecordingHandler()
+    poller = SnapshotPoller(handler, str(tmp_path), recursive=True, max_entries=2)
+    start_without_thread(poller)
+
+    (tmp_path / "week1").mkdir()
+    for i in range(3):
+        write(str(tmp_path / "week1" / f"slide{i}.pdf"), "x")
+    poll_passes(poller, 2)
+
+    created = [event for event in handler.events if isinstance(event, FileCreatedEvent)]
+    assert sorted(os.path.basename(event.src_path) for event in created) == ["slide0.pdf", "slide1.pdf",
+                                                                              "slide2.pdf"]
+    assert not any(isinstance(event, (FileDeletedEvent, FileModifiedEvent)) for event in handler.events)
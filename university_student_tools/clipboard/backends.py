@@ -0,0 +1,167 @@
+"""
+Module for cheap clipboard change detection before decoding clipboard images
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from typing import Hashable, List, Optional, Union
+from PIL import Image, ImageGrab
+
+
+class ClipboardBackend:
+    """
+    Access to the system clipboard.
+
+    change_token() must be cheap: it is called on every poll, while grab()
+    decodes the clipboard and is only called once the token changed.
+    """
+
+    def change_token(self) -> Optional[Hashable]:
+        """
+        Get a value that changes whenever the clipboard content changes.
+
+        Returns:
+            The token, or None if changes cannot be detected cheaply, in
+            which case the clipboard is decoded on every poll
+        """
+        return None
+
+    def grab(self) -> Union[Image.Image, List[str], None]:
+        """
+        Get the clipboard content.
+
+        Returns:
+            The image on the clipboard, the paths of the files copied to it,
+            or None if it holds neither
+        """
+        content = ImageGrab.grabclipboard()
+        if isinstance(content, Image.Image):
+            return content
+        if isinstance(content, list):
+            return [path for path in content if isinstance(path, str)]
+        return None
+
+
+class WindowsBackend(ClipboardBackend):
+    """Uses the clipboard sequence number, incremented by Windows on every change."""
+
+    def __init__(self):
+        import ctypes
+        self._sequence_number = ctypes.windll.user32.GetClipboardSequenceNumber
+
+    def change_token(self) -> Optional[Hashable]:
+        return self._sequence_number()
+
+
+class MacBackend(ClipboardBackend):
+    """Uses NSPasteboard's changeCount when PyObjC is installed."""
+
+    def __init__(self):
+        try:
+            from AppKit import NSPasteboard
+        except ImportError:
+            self._pasteboard = None
+        else:
+            self._pasteboard = NSPasteboard.generalPasteboard()
+
+    def change_token(self) -> Optional[Hashable]:
+        if self._pasteboard is None:
+            return None
+        return self._pasteboard.changeCount()
+
+
+class X11Backend(ClipboardBackend):
+    """Uses the TIMESTAMP target, the time the current clipboard owner acquired the selection."""
+
+    def __init__(self):
+        self._xclip = shutil.which("xclip")
+
+    def change_token(self) -> Optional[Hashable]:
+        if self._xclip is None:
+            return None
+        try:
+            result = subprocess.run([self._xclip, "-selection", "clipboard", "-t", "TIMESTAMP", "-o"],
+                                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=1)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        if result.returncode != 0:
+            # Empty clipboard or an owner that does not support TIMESTAMP
+            return None
+        return result.stdout.strip()
+
+
+class FakeBackend(ClipboardBackend):
+    """In-memory clipboard for running the monitors headless, e.g. in tests."""
+
+    def __init__(self):
+        self._content: Union[Image.Image, List[str], None] = None
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self.grab_count = 0
+
+    def set_image(self, image: Optional[Image.Image]) -> None:
+        """Put an image (or nothing) on the fake clipboard."""
+        with self._lock:
+            self._content = image
+            self._sequence += 1
+
+    def set_files(self, paths: List[str]) -> None:
+        """Put a list of copied files on the fake clipboard."""
+        with self._lock:
+            self._content = list(paths)
+            self._sequence += 1
+
+    def change_token(self) -> Optional[Hashable]:
+        with self._lock:
+            return self._sequence
+
+    def grab(self) -> Union[Image.Image, List[str], None]:
+        with self._lock:
+            self.grab_count += 1
+            return self._content
+
+
+def default_backend() -> ClipboardBackend:
+    """Get the clipboard backend of the current platform."""
+    if sys.platform == "win32":
+        return WindowsBackend()
+    if sys.platform == "darwin":
+        return MacBackend()
+    if os.environ.get("WAYLAND_DISPLAY"):
+        # wl-paste has no cheap way to detect changes
+        return ClipboardBackend()
+    return X11Backend()
+
+
+class ClipboardWatcher:
+    """Decode the clipboard only when its change token says the content changed."""
+
+    def __init__(self, backend: Optional[ClipboardBackend] = None):
+        """
+        Initialize the watcher.
+
+        Args:
+            backend: Clipboard access; the platform's backend by default
+        """
+        self.backend = backend or default_backend()
+        self._last_token: Optional[Hashable] = None
+
+    def poll(self) -> Union[Image.Image, List[str], None]:
+        """
+        Get the clipboard content if the clipboard changed since the last poll.
+
+        Returns:
+            The new image or list of copied file paths, or None if the
+            clipboard is unchanged or holds neither
+        """
+        token = self.backend.change_token()
+        if token is not None and token == self._last_token:
+            return None
+        # Only remembered once grabbed: a failed grab (e.g. the clipboard still
+        # held by another application) is retried on the next poll
+        content = self.backend.grab()
+        self._last_token = token
+        return content
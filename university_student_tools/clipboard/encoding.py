@@ -0,0 +1,253 @@
+"""
+Module for encoding clipboard images off the polling loop
+"""
+
+import io
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple
+from PIL import Image
+
+from .image_index import image_digest
+from .preprocess import ImagePreprocessor
+
+# Extensions of every format the images may be saved in
+EXTENSIONS = {"png": "png", "webp": "webp", "jpeg": "jpg"}
+
+
+class ImageFormat:
+    """File format and encoder settings used to save clipboard images."""
+
+    def __init__(self, name: str = "png", compress_level: int = 6, optimize: bool = False,
+                 quality: int = 85):
+        """
+        Initialize the format.
+
+        Args:
+            name: 'png' (lossless), or 'webp' / 'jpeg' (lossy)
+            compress_level: PNG zlib level from 0 (fastest) to 9 (smallest)
+            optimize: Let the encoder search for a smaller encoding (slower)
+            quality: WebP/JPEG quality from 1 to 100
+        """
+        if name not in EXTENSIONS:
+            raise ValueError(f"Unsupported image format '{name}'")
+        self.name = name
+        self.compress_level = compress_level
+        self.optimize = optimize
+        self.quality = quality
+
+    @property
+    def extension(self) -> str:
+        """File extension, without the dot, of images saved in this format."""
+        return EXTENSIONS[self.name]
+
+    @property
+    def name_format(self) -> str:
+        """Format string turning an image number into a file name."""
+        return f"image{{}}.{self.extension}"
+
+    def save(self, image: Image.Image, file_path: str) -> None:
+        """Encode an image into file_path with these settings."""
+        if self.name == "png":
+            image.save(file_path, format="PNG", compress_level=self.compress_level, optimize=self.optimize)
+            return
+        if self.name == "jpeg" and image.mode not in ("RGB", "L"):
+            # JPEG has no alpha channel: flatten onto white like a PDF page
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.convert("RGBA").getchannel("A"))
+            image = background
+        image.save(file_path, format=self.name.upper(), quality=self.quality, optimize=self.optimize)
+
+
+def write_image(image: Image.Image, file_path: str, image_format: ImageFormat) -> None:
+    """
+    Encode an image into a temporary file and rename it over file_path.
+
+    The folder never holds a half-written image; if encoding fails, both the
+    temporary file and file_path (a reserved, empty placeholder) are removed.
+    """
+    folder_path, file_name = os.path.split(file_path)
+    tmp_path = os.path.join(folder_path, f".{file_name}.tmp")
+    try:
+        image_format.save(image, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        for path in (tmp_path, file_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        raise
+
+
+def digest_image_file(source_path: str) -> Optional[str]:
+    """
+    Hash the pixels of an image file.
+
+    Returns:
+        The digest, or None if the file is not an image Pillow can read
+    """
+    try:
+        with Image.open(source_path) as image:
+            image.load()
+            return image_digest(image)
+    except OSError:
+        return None
+
+
+def preprocess_and_write(image: Image.Image, file_path: str, image_format: ImageFormat,
+                         preprocessor: ImagePreprocessor) -> Optional[str]:
+    """
+    Preprocess an image and write it to file_path.
+
+    Returns:
+        A line describing the steps applied and the size of the file, or None
+        if preprocessing left the image unchanged. The bytes saved are only
+        included when the preprocessor's report_savings is set, since they
+        take a second, unpreprocessed encode of the image to measure.
+    """
+    processed, steps = preprocessor.process(image)
+    write_image(processed, file_path, image_format)
+    if not steps:
+        return None
+    size = os.path.getsize(file_path)
+    report = f"Preprocessed {os.path.basename(file_path)} ({', '.join(steps)}): {size // 1024} KiB"
+    if preprocessor.report_savings:
+        baseline = io.BytesIO()
+        image_format.save(image, baseline)
+        report += (f", {(baseline.tell() - size) // 1024} KiB saved "
+                   f"({baseline.tell() // 1024} KiB without preprocessing)")
+    return report
+
+
+def convert_image_file(source_path: str, file_path: str, image_format: ImageFormat,
+                       preprocessor: Optional[ImagePreprocessor] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Re-encode an image file into file_path with the given format.
+
+    Runs in the batch worker processes, so it only takes picklable arguments.
+
+    Returns:
+        The error, or None on success, as a description (exceptions of the
+        worker would lose their traceback crossing the process boundary), and
+        the preprocessing report of preprocess_and_write
+    """
+    report = None
+    try:
+        with Image.open(source_path) as image:
+            image.load()
+            if preprocessor is None:
+                write_image(image, file_path, image_format)
+            else:
+                report = preprocess_and_write(image, file_path, image_format, preprocessor)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}", None
+    return None, report
+
+
+class ImageEncoder:
+    """
+    Encode and write images on a background thread.
+
+    Saves run one at a time in submission order, so the clipboard keeps
+    being polled while a large screenshot is compressed. Batches of copied
+    image files are decoded and encoded in parallel on a process pool,
+    started on the first batch.
+    """
+
+    def __init__(self, image_format: Optional[ImageFormat] = None,
+                 preprocessor: Optional[ImagePreprocessor] = None, batch_workers: Optional[int] = None):
+        """
+        Initialize the encoder.
+
+        Args:
+            image_format: Format and settings of the saved images; PNG by default
+            preprocessor: Steps applied to each image before it is encoded
+            batch_workers: Processes converting batches of image files; one per CPU by default
+        """
+        self.image_format = image_format or ImageFormat()
+        self.preprocessor = preprocessor if preprocessor is not None and preprocessor.enabled else None
+        self.batch_workers = batch_workers
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ImageEncoder")
+        self._batch_executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending_count(self) -> int:
+        """Number of images waiting to be written."""
+        with self._lock:
+            return self._pending
+
+    def submit(self, image: Image.Image, file_path: str,
+               on_done: Optional[Callable[[str, Optional[BaseException]], None]] = None) -> Future:
+        """
+        Queue an image to be written to file_path.
+
+        Args:
+            image: Image to encode
+            file_path: Reserved path to write the image to
+            on_done: Called on the encoder thread as on_done(file_path, error),
+                with error None on success
+        """
+        with self._lock:
+            self._pending += 1
+        return self._executor.submit(self._write, image, file_path, on_done)
+
+    def _write(self, image: Image.Image, file_path: str,
+               on_done: Optional[Callable[[str, Optional[BaseException]], None]]) -> None:
+        error = None
+        try:
+            if self.preprocessor is None:
+                write_image(image, file_path, self.image_format)
+            else:
+                report = preprocess_and_write(image, file_path, self.image_format, self.preprocessor)
+                if report is not None:
+                    print(report)
+        except Exception as e:
+            error = e
+        finally:
+            with self._lock:
+                self._pending -= 1
+        if on_done is not None:
+            try:
+                on_done(file_path, error)
+            except Exception as e:
+                print(f"An error occurred after saving '{file_path}': {e}")
+
+    def _batch_pool(self) -> ProcessPoolExecutor:
+        """Get the process pool converting batches, starting it if needed."""
+        with self._lock:
+            if self._batch_executor is None:
+                self._batch_executor = ProcessPoolExecutor(max_workers=self.batch_workers)
+            return self._batch_executor
+
+    def digest_files(self, source_paths: Sequence[str]) -> List[Optional[str]]:
+        """
+        Hash the pixels of image files in parallel (blocking).
+
+        Returns:
+            The digest of each file in order, None for files that are not images
+        """
+        return list(self._batch_pool().map(digest_image_file, source_paths))
+
+    def convert_files(self, source_paths: Sequence[str],
+                      file_paths: Sequence[str]) -> List[Tuple[Optional[str], Optional[str]]]:
+        """
+        Write image files to reserved paths in this encoder's format, in parallel (blocking).
+
+        Returns:
+            For each file in order, the error that prevented saving it (None on
+            success; the reserved path of a failed file is removed) and its
+            preprocessing report, if any
+        """
+        count = len(source_paths)
+        return list(self._batch_pool().map(convert_image_file, source_paths, file_paths,
+                                           [self.image_format] * count, [self.preprocessor] * count))
+
+    def close(self) -> None:
+        """Finish writing the queued images and stop the background workers."""
+        self._executor.shutdown(wait=True)
+        if self._batch_executor is not None:
+            self._batch_executor.shutdown(wait=True)
@@ -0,0 +1,134 @@
+"""
+Module for keeping an include file of every figure saved to a target folder
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from typing import List, Optional
+
+FIGURES_TEX = "figures.tex"
+FIGURES_LOG = "figures.jsonl"
+
+
+class FiguresManifest:
+    """
+    figures.tex listing the LaTeX code of every image saved to a folder.
+
+    Each save appends one record to the JSON Lines sidecar and its LaTeX code
+    to figures.tex, so the cost of a capture does not depend on the number of
+    figures already in the folder. The sidecar is the source of truth:
+    compact() rewrites both files from it, dropping the figures whose image
+    was deleted.
+    """
+
+    def __init__(self, folder_path: str):
+        """
+        Initialize the manifest.
+
+        Args:
+            folder_path: Folder holding the images, figures.tex and its sidecar
+        """
+        self.folder_path = folder_path
+        self.tex_path = os.path.join(folder_path, FIGURES_TEX)
+        self.log_path = os.path.join(folder_path, FIGURES_LOG)
+        self._lock = threading.Lock()
+
+    def append(self, file_name: str, latex_code: str, content_hash: Optional[str] = None) -> None:
+        """
+        Record a saved image.
+
+        Args:
+            file_name: Name of the image in the folder
+            latex_code: LaTeX code including the image
+            content_hash: Pixel hash of the image, if known
+        """
+        record = {"file": file_name, "latex": latex_code, "hash": content_hash, "saved": time.time()}
+        with self._lock:
+            # Sidecar first: an entry missing from figures.tex is restored by compact()
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+            with open(self.tex_path, "a", encoding="utf-8") as f:
+                f.write(latex_code + "\n\n")
+
+    def records(self) -> List[dict]:
+        """
+        Read the sidecar's records in save order.
+
+        Lines cut short by a crash in the middle of an append are skipped.
+        """
+        records = []
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict) and "file" in record and "latex" in record:
+                        records.append(record)
+        except FileNotFoundError:
+            pass
+        return records
+
+    def compact(self) -> int:
+        """
+        Rewrite figures.tex and the sidecar without deleted or repeated images.
+
+        Both files are replaced atomically; figures keep the order they were
+        first saved in.
+
+        Returns:
+            Number of records removed
+        """
+        with self._lock:
+            records = self.records()
+            kept = []
+            seen = set()
+            for record in records:
+                if record["file"] in seen or not os.path.exists(os.path.join(self.folder_path, record["file"])):
+                    continue
+                seen.add(record["file"])
+                kept.append(record)
+            self._replace(self.log_path, "".join(json.dumps(record) + "\n" for record in kept))
+            self._replace(self.tex_path, "".join(record["latex"] + "\n\n" for record in kept))
+        return len(records) - len(kept)
+
+    @staticmethod
+    def _replace(file_path: str, content: str) -> None:
+        """Write content to a temporary file and rename it over file_path."""
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, file_path)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m university_student_tools.clipboard.figures",
+        description=f"Maintain the {FIGURES_TEX} include file of an image folder.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    compact = commands.add_parser("compact", help=f"Remove deleted images from {FIGURES_TEX}")
+    compact.add_argument("folder_path", help="Folder the images are saved to")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list] = None):
+    """Main entry point for the script."""
+    args = parse_args(argv)
+    if not os.path.isdir(args.folder_path):
+        print(f"The path '{args.folder_path}' is not a valid directory.")
+        sys.exit(1)
+
+    manifest = FiguresManifest(args.folder_path)
+    removed = manifest.compact()
+    print(f"Compacted {manifest.tex_path}: {len(manifest.records())} figure(s) kept, {removed} entry(ies) removed.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+Module for numbering image files dropped into the target folder
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import os
+import sys
+import time
+import pyperclip
+from typing import Optional
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+
+from ..file_manager.debounce import EventDebouncer
+from ..file_manager.stability import wait_until_stable
+from ..runtime import run_monitors
+from .figures import FiguresManifest
+from .numbering import IMAGE_NAME_PATTERN, ImageCounter
+
+# Extensions of dropped files that are numbered, mapped to the extension they are saved with
+DROP_EXTENSIONS = {".png": "png", ".jpg": "jpg", ".jpeg": "jpg", ".webp": "webp"}
+# Name of the files that are numbered unless another pattern is given, as in the original script
+DEFAULT_PATTERN = "img.png"
+# Attempts at renaming a drop that is still locked by the program writing it
+RENAME_ATTEMPTS = 20
+
+
+def get_drop_latex_code(file_name: str) -> str:
+    """
+    Generate the LaTeX code for a numbered drop.
+
+    This is the snippet of the original scripts/imageLaTeX.py (0.8\\textwidth, no
+    extension), which differs from the clipboard tool's.
+    """
+    image_name = os.path.splitext(file_name)[0]
+    return f"\\begin{{center}}\n    \\includegraphics[width=0.8\\textwidth]{{images/{image_name}}}\n\\end{{center}}"
+
+
+class DropHandler(FileSystemEventHandler):
+    """
+    Rename images dropped into a folder to the next imageN file.
+
+    Events are coalesced per file by a debouncer, which hands each drop over
+    in arrival order once its events stopped; the file is then polled until
+    its size and modification time settle. Numbers come from an in-memory
+    ImageCounter, and each drop is moved over its exclusively reserved name,
+    so bursts of drops never collide or rescan the folder.
+    """
+
+    def __init__(self, folder_path: str, pattern: str = DEFAULT_PATTERN, quiet_period: float = 0.5):
+        """
+        Initialize the handler.
+
+        Args:
+            folder_path: Folder the images are dropped into
+            pattern: Glob the names of dropped files must match; other files,
+                whether already in the folder or dropped later, are never renamed
+            quiet_period: Seconds a drop must go without events before it is renamed
+        """
+        self.folder_path = folder_path
+        self.pattern = pattern
+        self.counter = ImageCounter(folder_path)
+        self.figures = FiguresManifest(folder_path)
+        self.debouncer = EventDebouncer(self.rename_drop, quiet_period)
+        self.attempts = {}
+
+    def start(self) -> None:
+        """Start renaming drops, including those matching the pattern already in the folder."""
+        self.debouncer.start()
+        with os.scandir(self.folder_path) as entries:
+            for entry in sorted(entries, key=lambda e: e.stat().st_mtime_ns):
+                if entry.is_file() and self.is_drop(entry.name):
+                    self.debouncer.touch(entry.path)
+
+    def close(self) -> None:
+        """Rename the drops still waiting for their quiet period and stop."""
+        self.debouncer.stop(flush=True)
+
+    def is_drop(self, file_name: str) -> bool:
+        """Check whether a file is a dropped image still to be numbered."""
+        if file_name.startswith(".") or IMAGE_NAME_PATTERN.match(file_name):
+            return False
+        if os.path.splitext(file_name)[1].lower() not in DROP_EXTENSIONS:
+            return False
+        return fnmatch.fnmatch(file_name, self.pattern)
+
+    def on_created(self, event: FileSystemEvent) -> None:
+        self.handle_event(event.src_path, event.is_directory)
+
+    def on_modified(self, event: FileSystemEvent) -> None:
+        self.handle_event(event.src_path, event.is_directory)
+
+    def on_moved(self, event: FileSystemEvent) -> None:
+        self.counter.observe(os.path.basename(event.dest_path))
+        self.handle_event(event.dest_path, event.is_directory)
+
+    def handle_event(self, file_path: str, is_directory: bool) -> None:
+        """Queue a drop, pushing its rename back while it keeps being written."""
+        if is_directory or os.path.dirname(os.path.abspath(file_path)) != os.path.abspath(self.folder_path):
+            return
+        if self.is_drop(os.path.basename(file_path)):
+            self.debouncer.touch(file_path)
+
+    def rename_drop(self, file_path: str, last_event: float) -> None:
+        """
+        Move a settled drop to the next free imageN name and copy its LaTeX code.
+
+        Args:
+            file_path: Path of the dropped file
+            last_event: time.monotonic() timestamp of the last event seen for the file
+        """
+        file_name = os.path.basename(file_path)
+        try:
+            if wait_until_stable(file_path) is None:
+                # Already renamed, or removed again
+                self.attempts.pop(file_path, None)
+                return
+        except TimeoutError as e:
+            print(f"Skipped '{file_name}': {e}")
+            return
+
+        extension = DROP_EXTENSIONS[os.path.splitext(file_name)[1].lower()]
+        _, new_file_path = self.counter.reserve(f"image{{}}.{extension}")
+        try:
+            os.replace(file_path, new_file_path)
+        except OSError as e:
+            os.remove(new_file_path)
+            attempts = self.attempts.get(file_path, 0) + 1
+            if isinstance(e, PermissionError) and attempts < RENAME_ATTEMPTS:
+                # Still open in the program writing it (Windows): try again later
+                self.attempts[file_path] = attempts
+                self.debouncer.touch(file_path)
+            else:
+                self.attempts.pop(file_path, None)
+                print(f"Could not rename '{file_name}': {e}")
+            return
+        self.attempts.pop(file_path, None)
+
+        new_file_name = os.path.basename(new_file_path)
+        latex_code = get_drop_latex_code(new_file_name)
+        self.figures.append(new_file_name, latex_code)
+        pyperclip.copy(latex_code)
+        print(f"Renamed '{file_name}' to '{new_file_name}' ({time.monotonic() - last_event:.2f}s after last write) "
+              f"and copied LaTeX code to clipboard.")
+
+
+async def watch_drops(folder_path: str, pattern: str = DEFAULT_PATTERN, quiet_period: float = 0.5) -> None:
+    """
+    Number images dropped into a folder until cancelled.
+
+    Args:
+        folder_path: Folder the images are dropped into
+        pattern: Glob the names of dropped files must match
+        quiet_period: Seconds a drop must go without events before it is renamed
+    """
+    handler = DropHandler(folder_path, pattern, quiet_period)
+    observer = Observer()
+    observer.schedule(handler, path=folder_path, recursive=False)
+    observer.start()
+    handler.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        observer.stop()
+        observer.join()
+        handler.close()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m university_student_tools.clipboard.file_drop",
+        description="Rename images dropped into a folder to imageN and copy LaTeX code for them.",
+    )
+    parser.add_argument("folder_path", help="Folder the images are dropped into")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN,
+                        help=f"Glob of the dropped files to number, e.g. 'img*.png'; files must end in "
+                             f"{', '.join(sorted(DROP_EXTENSIONS))} and other files, including existing ones, "
+                             f"are left alone (default: {DEFAULT_PATTERN})")
+    parser.add_argument("--quiet-period", type=float, default=0.5,
+                        help="Seconds a drop must go without events before it is renamed (default: 0.5)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list] = None):
+    """Main entry point for the script."""
+    args = parse_args(argv)
+    if not os.path.isdir(args.folder_path):
+        print(f"The path '{args.folder_path}' is not a valid directory.")
+        sys.exit(1)
+
+    print(f"Monitoring directory: {args.folder_path}")
+    run_monitors(watch_drops(args.folder_path, args.pattern, args.quiet_period))
+
+
+if __name__ == '__main__':
+    main()
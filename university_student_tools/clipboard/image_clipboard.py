@@ -2,70 +2,273 @@
 Module for handling clipboard image operations and LaTeX code generation
 """
 
+import argparse
+import asyncio
 import os
-import time
 import sys
-import re
 import pyperclip
 from PIL import ImageGrab
-from typing import Optional
-
-def get_max_image_number(folder_path: str) -> int:
-    """Get the highest image number in the target folder."""
-    max_number = 0
-    pattern = re.compile(r"^image(\d+)\.png$")
-    for f in os.listdir(folder_path):
-        match = pattern.match(f)
-        if match:
-            image_number = int(match.group(1))
-            if image_number > max_number:
-                max_number = image_number
-    return max_number
-
-def save_image_to_folder(image: ImageGrab.Image, folder_path: str, image_number: int) -> str:
-    """Save the image to the specified folder with the given number."""
-    new_file_name = f"image{image_number}.png"
-    new_file_path = os.path.join(folder_path, new_file_name)
-    image.save(new_file_path)
-    return new_file_name
+from typing import Callable, List, Optional, Tuple
+from watchdog.observers import Observer
+
+from ..runtime import run_blocking, run_monitors
+from .backends import ClipboardBackend, ClipboardWatcher
+from .encoding import EXTENSIONS, ImageEncoder, ImageFormat
+from .figures import FiguresManifest
+from .image_index import ImageHashIndex, image_digest
+from .preprocess import DEFAULT_LINE_WIDTH, ImagePreprocessor
+from .numbering import CounterEventHandler, ImageCounter
 
 def get_latex_code(folder_path: str, file_name: str) -> str:
     """Generate LaTeX code for the image."""
     return f"\\begin{{center}}\n    \\includegraphics[width=0.5\\linewidth]{{images/{file_name}}}\n\\end{{center}}"
 
-def monitor_clipboard(folder_path: str) -> None:
-    """Monitor clipboard for images and save them with LaTeX code."""
-    last_paste_time = 0
+class CaptureTarget:
+    """Folder clipboard images are saved to, with its image counter, duplicate index and figures.tex."""
+
+    def __init__(self, folder_path: str, image_format: Optional[ImageFormat] = None):
+        """
+        Initialize the target.
+
+        Args:
+            folder_path: Folder the images are saved to
+            image_format: Format of the saved images, which sets their file names
+        """
+        self.folder_path = folder_path
+        self.counter = ImageCounter(folder_path, name_format=(image_format or ImageFormat()).name_format)
+        self.index = ImageHashIndex(folder_path)
+        self.figures = FiguresManifest(folder_path)
+        self._observer = None
+
+    def start(self) -> None:
+        """Start following the folder, keeping the counter in sync with images saved by other instances."""
+        self._observer = Observer()
+        self._observer.schedule(CounterEventHandler(self.counter), path=self.folder_path, recursive=False)
+        self._observer.start()
+
+    def stop(self) -> None:
+        """Stop following the folder and save the duplicate index."""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        self.index.save()
+
+    async def capture(self, image: ImageGrab.Image, content_hash: str, encoder: ImageEncoder) -> None:
+        """
+        Save a clipboard image and copy its LaTeX code to the clipboard.
+
+        Images already saved in the folder are not written again; the LaTeX
+        code of the existing file is copied instead. New images are encoded by
+        the background encoder; their file name is reserved first, so the
+        LaTeX code is available at once.
+        """
+        existing = await run_blocking(self.index.find, content_hash)
+        if existing is not None:
+            pyperclip.copy(get_latex_code(self.folder_path, existing))
+            print(f"Image already saved as {existing}; copied its LaTeX code to clipboard.")
+            return
+        _, file_path = await run_blocking(self.counter.reserve)
+        new_file_name = os.path.basename(file_path)
+        encoder.submit(image, file_path, saved_callback(self.index, content_hash, self.figures))
+        latex_code = get_latex_code(self.folder_path, new_file_name)
+        pyperclip.copy(latex_code)
+        print(f"Saving {new_file_name}; copied LaTeX code to clipboard.")
+
+    async def capture_files(self, source_paths: List[str], encoder: ImageEncoder) -> None:
+        """
+        Save image files copied to the clipboard and copy one LaTeX snippet for all of them.
+
+        The files are decoded and hashed, then converted, on the encoder's
+        process pool. Numbers are reserved in clipboard order before any file
+        is converted, so the figures are numbered in the order they were
+        copied whatever order the workers finish in. Files already saved in
+        the folder, or repeated in the batch, reuse the existing file name;
+        files that are not images are skipped.
+        """
+        digests = await run_blocking(encoder.digest_files, source_paths)
+        file_names = []
+        names_by_hash = {}
+        new_files = []
+        for source_path, content_hash in zip(source_paths, digests):
+            if content_hash is None:
+                print(f"Skipped '{os.path.basename(source_path)}': not an image.")
+                continue
+            file_name = names_by_hash.get(content_hash)
+            if file_name is None:
+                file_name = await run_blocking(self.index.find, content_hash)
+            if file_name is None:
+                _, file_path = await run_blocking(self.counter.reserve)
+                file_name = os.path.basename(file_path)
+                new_files.append((source_path, file_path, content_hash))
+            names_by_hash[content_hash] = file_name
+            file_names.append(file_name)
+        if not file_names:
+            return
+
+        results = await run_blocking(encoder.convert_files, [source for source, _, _ in new_files],
+                                    [file_path for _, file_path, _ in new_files])
+        failed = set()
+        for (source_path, file_path, content_hash), (error, report) in zip(new_files, results):
+            file_name = os.path.basename(file_path)
+            if report is not None:
+                print(report)
+            if error is not None:
+                print(f"Failed to save '{os.path.basename(source_path)}' as {file_name}: {error}")
+                failed.add(file_name)
+            else:
+                self.index.add(file_name, content_hash)
+                self.figures.append(file_name, get_latex_code(self.folder_path, file_name), content_hash)
+        file_names = [file_name for file_name in file_names if file_name not in failed]
+        if not file_names:
+            return
+        pyperclip.copy("\n\n".join(get_latex_code(self.folder_path, file_name) for file_name in file_names))
+        print(f"Saved {len(new_files) - len(failed)} of {len(source_paths)} copied file(s); "
+              f"copied LaTeX code for {', '.join(file_names)} to clipboard.")
+
+async def watch_clipboard(folder_path: str, interval: float = 1.0,
+                          backend: Optional[ClipboardBackend] = None,
+                          image_format: Optional[ImageFormat] = None,
+                          preprocessor: Optional[ImagePreprocessor] = None) -> None:
+    """
+    Monitor clipboard for images and save them with LaTeX code until cancelled.
+
+    Args:
+        folder_path: Folder the images are saved to
+        interval: Seconds between two clipboard checks
+        backend: Clipboard access; the platform's backend by default
+        image_format: Format and encoder settings of the saved images; PNG by default
+        preprocessor: Trimming, downscaling and quantization applied before saving
+    """
+    encoder = ImageEncoder(image_format, preprocessor)
+    target = CaptureTarget(folder_path, encoder.image_format)
+    target.start()
+    try:
+        await poll_clipboard(ClipboardWatcher(backend), encoder, lambda: target, interval)
+    finally:
+        # Images still being encoded are added to the index saved by stop()
+        close_encoder(encoder)
+        target.stop()
+
+def close_encoder(encoder: ImageEncoder) -> None:
+    """Wait for the images still being encoded and stop the encoder."""
+    if encoder.pending_count:
+        print(f"Waiting for {encoder.pending_count} image(s) to be saved...")
+    encoder.close()
+
+async def poll_clipboard(watcher: ClipboardWatcher, encoder: ImageEncoder,
+                         get_target: Callable[[], Optional[CaptureTarget]], interval: float = 1.0) -> None:
+    """
+    Save every new PNG image, or batch of copied image files, found on the
+    clipboard, decoding it only after a change.
+
+    Args:
+        watcher: Detects clipboard changes and decodes the clipboard
+        encoder: Writes the images in the background
+        get_target: Returns the target of the next capture, or None to ignore it
+        interval: Seconds between two clipboard checks
+    """
+    # No rate limit: the watcher only returns content once per clipboard change,
+    # and copying the LaTeX code replaces the image on the clipboard
     while True:
         try:
-            image = ImageGrab.grabclipboard()
-            if image and image.format == 'PNG':
-                current_time = time.time()
-                if current_time - last_paste_time > 1:  # Prevent rapid successive saves
-                    max_number = get_max_image_number(folder_path)
-                    new_file_name = save_image_to_folder(image, folder_path, max_number + 1)
-                    latex_code = get_latex_code(folder_path, new_file_name)
-                    pyperclip.copy(latex_code)
-                    print(f"Saved {new_file_name} and copied LaTeX code to clipboard.")
-                    last_paste_time = current_time
+            content = await run_blocking(watcher.poll)
+            is_files = isinstance(content, list) and len(content) > 0
+            if is_files or (content and content.format == 'PNG'):
+                target = get_target()
+                if target is None:
+                    print("No active target: clipboard content ignored.")
+                elif is_files:
+                    await target.capture_files(content, encoder)
+                else:
+                    content_hash = await run_blocking(image_digest, content)
+                    await target.capture(content, content_hash, encoder)
         except Exception as e:
             print(f"An error occurred: {e}")
-        time.sleep(1)
+        await asyncio.sleep(interval)
 
-def main():
-    """Main entry point for the script."""
-    if len(sys.argv) != 2:
-        print("Usage: python -m university_student_tools.clipboard.image_clipboard /path/to/target/directory")
+def saved_callback(index: ImageHashIndex, content_hash: str, figures: Optional[FiguresManifest] = None):
+    """Get the encoder callback reporting a background save and recording the saved image."""
+    def on_saved(file_path: str, error: Optional[BaseException]) -> None:
+        file_name = os.path.basename(file_path)
+        if error is not None:
+            print(f"Failed to save {file_name}: {error}")
+            return
+        index.add(file_name, content_hash)
+        if figures is not None:
+            figures.append(file_name, get_latex_code(figures.folder_path, file_name), content_hash)
+        print(f"Saved {file_name} ({os.path.getsize(file_path) // 1024} KiB).")
+    return on_saved
+
+def monitor_clipboard(folder_path: str, image_format: Optional[ImageFormat] = None,
+                      preprocessor: Optional[ImagePreprocessor] = None) -> None:
+    """Monitor clipboard for images and save them with LaTeX code until interrupted."""
+    run_monitors(watch_clipboard(folder_path, image_format=image_format, preprocessor=preprocessor))
+
+def add_image_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options choosing the format and preprocessing of saved images."""
+    parser.add_argument("--format", dest="image_format", choices=sorted(EXTENSIONS), default="png",
+                        help="File format of the saved images; webp and jpeg are lossy, and pdflatex, "
+                             "xelatex and lualatex cannot include webp (default: png)")
+    parser.add_argument("--compress-level", type=int, default=6, choices=range(10), metavar="0-9",
+                        help="PNG compression level, higher is smaller but slower (default: 6)")
+    parser.add_argument("--optimize", action="store_true",
+                        help="Let the encoder search for a smaller file (slower)")
+    parser.add_argument("--quality", type=int, default=85, metavar="1-100",
+                        help="WebP/JPEG quality (default: 85)")
+    parser.add_argument("--trim", action="store_true",
+                        help="Crop uniform borders around the captured content (needs NumPy)")
+    parser.add_argument("--dpi", type=int, metavar="DPI",
+                        help="Downscale images to this resolution at their printed width of 0.5\\linewidth")
+    parser.add_argument("--line-width", type=float, default=DEFAULT_LINE_WIDTH, metavar="INCHES",
+                        help=f"Width of \\linewidth in the document (default: {DEFAULT_LINE_WIDTH})")
+    parser.add_argument("--quantize", type=int, nargs="?", const=256, metavar="COLORS",
+                        help="Save flat diagrams with at most COLORS colors (default: 256) as palette "
+                             "images (needs NumPy)")
+    parser.add_argument("--report-savings", action="store_true",
+                        help="Report the bytes preprocessing saved on each image; encodes preprocessed "
+                             "images twice")
+
+def image_options(args: argparse.Namespace) -> Tuple[ImageFormat, ImagePreprocessor]:
+    """
+    Build the image format and preprocessor from parsed command line arguments.
+
+    Exits with an error message if preprocessing needs NumPy and it is missing.
+    """
+    image_format = ImageFormat(args.image_format, compress_level=args.compress_level, optimize=args.optimize,
+                               quality=args.quality)
+    if image_format.name == "webp":
+        print("Note: pdflatex, xelatex and lualatex cannot include WebP images; convert them before compiling.")
+    try:
+        preprocessor = ImagePreprocessor(trim=args.trim, dpi=args.dpi, quantize=args.quantize,
+                                         line_width=args.line_width, report_savings=args.report_savings)
+    except RuntimeError as e:
+        print(e)
         sys.exit(1)
+    return image_format, preprocessor
 
-    folder_path = sys.argv[1]
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m university_student_tools.clipboard.image_clipboard",
+        description="Save clipboard images to a folder and copy LaTeX code for them.",
+    )
+    parser.add_argument("folder_path", help="Folder the images are saved to")
+    add_image_arguments(parser)
+    return parser.parse_args(argv)
+
+def main():
+    """Main entry point for the script."""
+    args = parse_args()
+    folder_path = args.folder_path
 
     if not os.path.isdir(folder_path):
         print(f"The path '{folder_path}' is not a valid directory.")
         sys.exit(1)
 
+    image_format, preprocessor = image_options(args)
     print(f"Monitoring clipboard and saving images to: {folder_path}")
-    monitor_clipboard(folder_path)
+    monitor_clipboard(folder_path, image_format, preprocessor)
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,162 @@
+"""
+Module for recognising clipboard images that were already saved to the target folder
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+from PIL import Image
+
+from ..file_manager.manifest import write_json_atomic
+from .numbering import IMAGE_NAME_PATTERN
+
+STATE_DIR = os.path.join(os.path.expanduser("~"), ".university_student_tools", "image_clipboard")
+
+
+def image_digest(image: Image.Image) -> str:
+    """Hash an image's pixels, so identical figures match whatever encoder wrote them."""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{image.mode}:{image.width}x{image.height}:".encode("ascii"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def default_index_path(folder_path: str) -> str:
+    """Get the index file of a target folder, kept in the user's state directory."""
+    key = hashlib.sha1(os.path.abspath(folder_path).encode("utf-8", "surrogateescape")).hexdigest()[:16]
+    return os.path.join(STATE_DIR, f"{key}-images.json")
+
+
+class ImageHashIndex:
+    """
+    Persisted pixel hashes of the images saved in a target folder.
+
+    The folder is only indexed the first time a lookup is made; images
+    whose size and modification time did not change since the last run
+    are not decoded again. Added images are persisted at most every
+    save_interval seconds, and by save() when the capture target stops;
+    images missing from a lost save are indexed again from the folder.
+    """
+
+    def __init__(self, folder_path: str, index_path: Optional[str] = None, name_pattern=IMAGE_NAME_PATTERN,
+                 save_interval: float = 10.0):
+        """
+        Initialize the index.
+
+        Args:
+            folder_path: Folder the images are saved to
+            index_path: JSON file the index is persisted to; defaults to a
+                file in the user's state directory
+            name_pattern: Compiled regex matching the file names to index
+            save_interval: Seconds between two writes of the index while images are added
+        """
+        self.folder_path = folder_path
+        self.index_path = index_path or default_index_path(folder_path)
+        self.name_pattern = name_pattern
+        self.entries: Dict[str, dict] = {}
+        self._by_hash: Dict[str, str] = {}
+        self.save_interval = save_interval
+        self._built = False
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("images", {})
+        except FileNotFoundError:
+            return {}
+        except (ValueError, OSError) as e:
+            print(f"Ignoring unreadable image index '{self.index_path}': {e}")
+            return {}
+
+    def save(self) -> None:
+        """Write the index to disk if it has changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": 1, "images": dict(self.entries)}
+            self._dirty = False
+            self._last_save = time.monotonic()
+        try:
+            write_json_atomic(self.index_path, data)
+        except OSError as e:
+            print(f"Failed to save image index '{self.index_path}': {e}")
+            with self._lock:
+                self._dirty = True
+
+    def save_if_due(self) -> None:
+        """Save the index if it has changed and save_interval seconds passed since the last save."""
+        if self._dirty and time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def _build(self) -> None:
+        """Index the folder, decoding only images that changed since they were last indexed."""
+        cached = self._load()
+        entries = {}
+        with os.scandir(self.folder_path) as it:
+            for entry in it:
+                if not self.name_pattern.match(entry.name):
+                    continue
+                try:
+                    stat = entry.stat()
+                    old = cached.get(entry.name)
+                    if old is not None and (old["size"], old["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                        entries[entry.name] = old
+                        continue
+                    if stat.st_size == 0:
+                        # Number reserved by an image still being written
+                        continue
+                    with Image.open(entry.path) as image:
+                        content_hash = image_digest(image)
+                except OSError:
+                    continue
+                entries[entry.name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": content_hash}
+        self.entries = entries
+        self._by_hash = {entry["hash"]: name for name, entry in entries.items()}
+        self._built = True
+        self._dirty = True
+
+    def find(self, content_hash: str) -> Optional[str]:
+        """
+        Get the name of a saved image with the given pixel hash.
+
+        Returns:
+            File name of the image, or None if it has not been saved yet
+        """
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._build()
+            self.save()
+        with self._lock:
+            file_name = self._by_hash.get(content_hash)
+            if file_name is None:
+                return None
+            entry = self.entries[file_name]
+            try:
+                stat = os.stat(os.path.join(self.folder_path, file_name))
+            except OSError:
+                stat = None
+            if stat is None or (stat.st_size, stat.st_mtime_ns) != (entry["size"], entry["mtime_ns"]):
+                # Deleted or replaced since it was indexed
+                del self._by_hash[content_hash]
+                del self.entries[file_name]
+                return None
+            return file_name
+
+    def add(self, file_name: str, content_hash: str) -> None:
+        """Record an image that has just been saved, persisting the index when a save is due."""
+        try:
+            stat = os.stat(os.path.join(self.folder_path, file_name))
+        except OSError:
+            return
+        with self._lock:
+            self.entries[file_name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": content_hash}
+            self._by_hash[content_hash] = file_name
+            self._dirty = True
+        self.save_if_due()
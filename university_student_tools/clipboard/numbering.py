@@ -0,0 +1,107 @@
+"""
+Module for handing out collision-free image numbers in a target folder
+"""
+
+import os
+import re
+import threading
+from typing import Optional, Tuple
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+
+# Numbers are shared by every format images may be saved in
+IMAGE_NAME_PATTERN = re.compile(r"^image(\d+)\.(?:png|webp|jpg)$")
+
+
+class ImageCounter:
+    """
+    In-memory counter of the highest imageN number in a folder.
+
+    The folder is listed once, when the first number is needed; afterwards
+    the counter is kept up to date from the numbers it hands out and from
+    directory events. Every number is reserved by creating its file
+    exclusively, so two instances saving into the same folder never write
+    the same imageN.png.
+    """
+
+    def __init__(self, folder_path: str, name_pattern=IMAGE_NAME_PATTERN, name_format: str = "image{}.png"):
+        """
+        Initialize the counter.
+
+        Args:
+            folder_path: Folder the images are saved to
+            name_pattern: Compiled regex matching numbered file names, with the number as group 1
+            name_format: Format string turning a number into a file name
+        """
+        self.folder_path = folder_path
+        self.name_pattern = name_pattern
+        self.name_format = name_format
+        self._max: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _seed(self) -> int:
+        """List the folder once to find the highest number in use."""
+        max_number = 0
+        with os.scandir(self.folder_path) as entries:
+            for entry in entries:
+                match = self.name_pattern.match(entry.name)
+                if match:
+                    max_number = max(max_number, int(match.group(1)))
+        return max_number
+
+    @property
+    def current(self) -> int:
+        """Highest number known to be in use."""
+        with self._lock:
+            if self._max is None:
+                self._max = self._seed()
+            return self._max
+
+    def observe(self, file_name: str) -> None:
+        """Account for a file that appeared in the folder, e.g. saved by another instance."""
+        match = self.name_pattern.match(file_name)
+        if match is None:
+            return
+        with self._lock:
+            if self._max is not None:
+                self._max = max(self._max, int(match.group(1)))
+
+    def reserve(self, name_format: Optional[str] = None) -> Tuple[int, str]:
+        """
+        Reserve the next free number by creating its (empty) file exclusively.
+
+        Args:
+            name_format: File name format to reserve, overriding the counter's
+
+        Returns:
+            The reserved number and the path of its file
+        """
+        with self._lock:
+            if self._max is None:
+                self._max = self._seed()
+            number = self._max + 1
+            while True:
+                file_path = os.path.join(self.folder_path, (name_format or self.name_format).format(number))
+                try:
+                    fd = os.open(file_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+                except FileExistsError:
+                    # Taken by another instance since the last event was seen
+                    number += 1
+                    continue
+                os.close(fd)
+                self._max = number
+                return number, file_path
+
+
+class CounterEventHandler(FileSystemEventHandler):
+    """Watchdog handler keeping an ImageCounter in sync with the target folder."""
+
+    def __init__(self, counter: ImageCounter):
+        self.counter = counter
+
+    def on_created(self, event: FileSystemEvent) -> None:
+        if not event.is_directory:
+            self.counter.observe(os.path.basename(event.src_path))
+
+    def on_moved(self, event: FileSystemEvent) -> None:
+        if not event.is_directory:
+            self.counter.observe(os.path.basename(event.dest_path))
@@ -0,0 +1,158 @@
+"""
+Module for shrinking clipboard captures before they are saved
+"""
+
+from typing import List, Optional, Tuple
+from PIL import Image
+
+try:
+    import numpy as np
+except ImportError:  # Optional: pip install university-student-tools[preprocess]
+    np = None
+
+# Width of \linewidth in inches for the standard article class (345pt)
+DEFAULT_LINE_WIDTH = 4.8
+# Fraction of \linewidth the figures are included at, as in get_latex_code
+FIGURE_WIDTH_FRACTION = 0.5
+# Pixels sampled to reject photos before counting every color of an image
+QUANTIZE_SAMPLE_SIZE = 65536
+
+
+def trim_borders(image: Image.Image, tolerance: int = 8, padding: int = 4) -> Image.Image:
+    """
+    Crop uniform borders, taking the top-left pixel as the border color.
+
+    Args:
+        image: Image to trim
+        tolerance: Largest per-channel difference still counted as border
+        padding: Pixels of border kept around the content
+
+    Returns:
+        The cropped image, or the image itself if there is nothing to trim
+    """
+    pixels = np.asarray(image.convert("RGBA"), dtype=np.int16)
+    content = (np.abs(pixels - pixels[0, 0]) > tolerance).any(axis=2)
+    rows = np.flatnonzero(content.any(axis=1))
+    columns = np.flatnonzero(content.any(axis=0))
+    if rows.size == 0:
+        # A single flat color: nothing to keep
+        return image
+    box = (max(int(columns[0]) - padding, 0), max(int(rows[0]) - padding, 0),
+           min(int(columns[-1]) + 1 + padding, image.width), min(int(rows[-1]) + 1 + padding, image.height))
+    if box == (0, 0, image.width, image.height):
+        return image
+    return image.crop(box)
+
+
+def downscale(image: Image.Image, dpi: int, width_inches: float) -> Image.Image:
+    """
+    Shrink an image to the pixel width it needs when printed width_inches wide at dpi.
+
+    Images already narrower than that are returned unchanged.
+    """
+    target_width = max(1, round(dpi * width_inches))
+    if image.width <= target_width:
+        return image
+    target_height = max(1, round(image.height * target_width / image.width))
+    return image.resize((target_width, target_height), Image.LANCZOS)
+
+
+def count_colors(image: Image.Image, limit: int) -> Optional[int]:
+    """
+    Count the distinct colors of an image, giving up above limit.
+
+    A random sample is checked first, so photos and gradients are rejected
+    without sorting every pixel.
+
+    Returns:
+        The number of colors, or None if there are more than limit
+    """
+    pixels = np.asarray(image.convert("RGBA")).reshape(-1, 4)
+    packed = pixels.view(np.uint32).ravel()
+    if packed.size > QUANTIZE_SAMPLE_SIZE:
+        sample = packed[np.random.default_rng(0).integers(0, packed.size, QUANTIZE_SAMPLE_SIZE)]
+        if np.unique(sample).size > limit:
+            return None
+    count = np.unique(packed).size
+    return count if count <= limit else None
+
+
+def quantize_flat(image: Image.Image, max_colors: int = 256) -> Image.Image:
+    """
+    Convert a flat diagram with at most max_colors colors to a palette image.
+
+    Screenshots of diagrams and slides usually have few colors, and a palette
+    PNG is a fraction of the size of an RGB one. Images with more colors, or
+    with partial transparency, are returned unchanged.
+    """
+    if image.mode == "RGBA":
+        alpha = np.asarray(image.getchannel("A"))
+        if (alpha != 255).any():
+            return image
+        image = image.convert("RGB")
+    elif image.mode not in ("RGB", "L"):
+        return image
+    colors = count_colors(image, max_colors)
+    if colors is None:
+        return image
+    return image.convert("P", palette=Image.ADAPTIVE, colors=colors)
+
+
+class ImagePreprocessor:
+    """Trim, downscale and quantize captures before they are encoded."""
+
+    def __init__(self, trim: bool = False, dpi: Optional[int] = None, quantize: Optional[int] = None,
+                 line_width: float = DEFAULT_LINE_WIDTH, width_fraction: float = FIGURE_WIDTH_FRACTION,
+                 report_savings: bool = False):
+        """
+        Initialize the preprocessor.
+
+        Args:
+            trim: Crop uniform borders
+            dpi: Downscale to this resolution at the printed figure width
+            quantize: Convert images with at most this many colors to a palette
+            line_width: Width of \\linewidth in the document, in inches
+            width_fraction: Fraction of \\linewidth the figures are included at
+            report_savings: Also encode the unpreprocessed image to report the bytes
+                saved, which doubles the encoding time of preprocessed images
+
+        Raises:
+            RuntimeError: If NumPy is not installed
+        """
+        if np is None and (trim or quantize):
+            raise RuntimeError("Image preprocessing needs NumPy: pip install numpy")
+        self.trim = trim
+        self.dpi = dpi
+        self.quantize = quantize
+        self.width_inches = line_width * width_fraction
+        self.report_savings = report_savings
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any step is enabled."""
+        return bool(self.trim or self.dpi or self.quantize)
+
+    def process(self, image: Image.Image) -> Tuple[Image.Image, List[str]]:
+        """
+        Apply the enabled steps.
+
+        Returns:
+            The processed image and a description of each step that changed it
+        """
+        steps = []
+        if self.trim:
+            trimmed = trim_borders(image)
+            if trimmed is not image:
+                steps.append(f"trimmed {image.width}x{image.height} to {trimmed.width}x{trimmed.height}")
+                image = trimmed
+        if self.dpi:
+            scaled = downscale(image, self.dpi, self.width_inches)
+            if scaled is not image:
+                steps.append(f"scaled to {scaled.width}x{scaled.height} for {self.dpi} dpi")
+                image = scaled
+        if self.quantize:
+            quantized = quantize_flat(image, self.quantize)
+            if quantized.mode == "P" and image.mode != "P":
+                steps.append(f"reduced to {len(quantized.getcolors(self.quantize) or ())} colors")
+                image = quantized
+        return image, steps
@@ -0,0 +1,209 @@
+"""
+Module for routing clipboard captures of one process to several course folders
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+from typing import Dict, List, Optional
+
+from ..runtime import run_monitors
+from .backends import ClipboardBackend, ClipboardWatcher
+from .encoding import ImageEncoder, ImageFormat
+from .image_clipboard import (CaptureTarget, add_image_arguments, close_encoder, image_options,
+                              poll_clipboard)
+from .preprocess import ImagePreprocessor
+
+CONTROL_HOST = "127.0.0.1"
+DEFAULT_PORT = 47813
+
+
+class ClipboardRouter:
+    """
+    Single clipboard monitor saving captures into the active course's folder.
+
+    The clipboard is polled and decoded once per change whatever the number
+    of courses. The active course is switched at runtime over a local TCP
+    control socket, which accepts one command per line:
+
+    - ``use NAME``: send the next captures to course NAME
+    - ``off``: ignore captures until a course is selected again
+    - ``status``: report the active course
+
+    Every command is answered with one line of JSON.
+    """
+
+    def __init__(self, courses: Dict[str, str], active: Optional[str] = None, port: int = DEFAULT_PORT,
+                 interval: float = 1.0, backend: Optional[ClipboardBackend] = None,
+                 image_format: Optional[ImageFormat] = None,
+                 preprocessor: Optional[ImagePreprocessor] = None):
+        """
+        Initialize the router.
+
+        Args:
+            courses: Folder the images of each course are saved to, by course name
+            active: Course receiving captures at start; none when omitted
+            port: Local port of the control socket
+            interval: Seconds between two clipboard checks
+            backend: Clipboard access; the platform's backend by default
+            image_format: Format and encoder settings of the saved images; PNG by default
+            preprocessor: Trimming, downscaling and quantization applied before saving
+        """
+        if active is not None and active not in courses:
+            raise ValueError(f"Unknown course '{active}'")
+        self.encoder = ImageEncoder(image_format, preprocessor)
+        self.targets = {name: CaptureTarget(folder_path, self.encoder.image_format)
+                        for name, folder_path in courses.items()}
+        self.active = active
+        self.port = port
+        self.interval = interval
+        self.watcher = ClipboardWatcher(backend)
+
+    def active_target(self) -> Optional[CaptureTarget]:
+        """Get the target of the next capture, or None if routing is off."""
+        return self.targets.get(self.active) if self.active is not None else None
+
+    def status(self) -> dict:
+        """Describe the router's state."""
+        return {"ok": True, "active": self.active, "courses": sorted(self.targets)}
+
+    def execute(self, command: str) -> dict:
+        """
+        Run one control command.
+
+        Returns:
+            The reply, with "ok" false and an "error" message if the command failed
+        """
+        parts = command.strip().split(maxsplit=1)
+        if not parts:
+            return {"ok": False, "error": "empty command"}
+        if parts[0] == "use" and len(parts) == 2:
+            if parts[1] not in self.targets:
+                return {"ok": False, "error": f"unknown course '{parts[1]}'"}
+            self.active = parts[1]
+            print(f"Clipboard images now go to '{self.active}': {self.targets[self.active].folder_path}")
+        elif parts[0] == "off" and len(parts) == 1:
+            self.active = None
+            print("Clipboard routing off: images are ignored until a course is selected.")
+        elif parts[0] != "status" or len(parts) != 1:
+            return {"ok": False, "error": f"unknown command '{command.strip()}'"}
+        return self.status()
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer the commands of one control connection."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = self.execute(line.decode("utf-8", "replace"))
+                writer.write((json.dumps(reply) + "\n").encode("utf-8"))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def run(self) -> None:
+        """Route clipboard captures and serve control commands until cancelled."""
+        server = await asyncio.start_server(self._serve_client, CONTROL_HOST, self.port)
+        for target in self.targets.values():
+            target.start()
+        try:
+            await poll_clipboard(self.watcher, self.encoder, self.active_target, self.interval)
+        finally:
+            server.close()
+            await server.wait_closed()
+            close_encoder(self.encoder)
+            for target in self.targets.values():
+                target.stop()
+
+
+def send_command(command: str, port: int = DEFAULT_PORT, timeout: float = 2.0) -> dict:
+    """
+    Send a control command to a running router.
+
+    Returns:
+        The router's reply
+
+    Raises:
+        OSError: If no router is listening on port
+    """
+    with socket.create_connection((CONTROL_HOST, port), timeout=timeout) as connection:
+        connection.sendall((command + "\n").encode("utf-8"))
+        reply = connection.makefile("r", encoding="utf-8").readline()
+    if not reply:
+        raise ConnectionError("the router closed the connection")
+    return json.loads(reply)
+
+
+def parse_course(value: str) -> List[str]:
+    """Split a NAME=FOLDER course argument."""
+    name, separator, folder_path = value.partition("=")
+    if not separator or not name or not folder_path:
+        raise argparse.ArgumentTypeError(f"expected NAME=FOLDER, got '{value}'")
+    return [name, folder_path]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m university_student_tools.clipboard.router",
+        description="Save clipboard images into the active course's folder from a single process.",
+    )
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"Local port of the control socket (default: {DEFAULT_PORT})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run the clipboard router")
+    serve.add_argument("--course", dest="courses", action="append", type=parse_course, required=True,
+                       metavar="NAME=FOLDER", help="Course name and image folder (repeatable)")
+    serve.add_argument("--active", help="Course receiving captures at start (default: none)")
+    serve.add_argument("--interval", type=float, default=1.0,
+                       help="Seconds between two clipboard checks (default: 1.0)")
+    add_image_arguments(serve)
+
+    use = commands.add_parser("use", help="Send the next captures to a course")
+    use.add_argument("course")
+    commands.add_parser("off", help="Ignore captures until a course is selected")
+    commands.add_parser("status", help="Show the active course")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main entry point for the script."""
+    args = parse_args()
+    if args.command != "serve":
+        command = f"use {args.course}" if args.command == "use" else args.command
+        try:
+            reply = send_command(command, args.port)
+        except (OSError, ValueError) as e:
+            print(f"Could not reach the clipboard router on port {args.port}: {e}")
+            sys.exit(1)
+        if not reply.get("ok"):
+            print(f"Error: {reply.get('error')}")
+            sys.exit(1)
+        print(f"Active course: {reply['active'] or 'none'} (courses: {', '.join(reply['courses'])})")
+        return
+
+    courses = dict(args.courses)
+    for folder_path in courses.values():
+        if not os.path.isdir(folder_path):
+            print(f"The path '{folder_path}' is not a valid directory.")
+            sys.exit(1)
+    if args.active is not None and args.active not in courses:
+        print(f"Unknown course '{args.active}'.")
+        sys.exit(1)
+
+    image_format, preprocessor = image_options(args)
+    router = ClipboardRouter(courses, active=args.active, port=args.port, interval=args.interval,
+                             image_format=image_format, preprocessor=preprocessor)
+    print(f"Routing clipboard images for {len(courses)} course(s); control port {args.port}")
+    run_monitors(router.run())
+
+
+if __name__ == '__main__':
+    main()
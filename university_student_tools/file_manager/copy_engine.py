@@ -0,0 +1,432 @@
+"""
+Module implementing the file copy backends, preferring kernel-assisted copies
+"""
+
+import errno
+import hashlib
+import json
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+from typing import BinaryIO, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from .manifest import write_json_atomic
+
+# ioctl request number of FICLONE from <linux/fs.h>
+FICLONE = 0x40049409
+SENDFILE_CHUNK_SIZE = 1024 * 1024 * 1024
+# Suffix of the temporary files copies are written to before being published
+TEMP_SUFFIX = ".copy_files.tmp"
+FAN_OUT_CHUNK_SIZE = 1024 * 1024
+# Chunks buffered per destination, bounding memory to about chunk size times this
+FAN_OUT_MAX_PENDING = 8
+RESUME_CHUNK_SIZE = 8 * 1024 * 1024
+# Chunks written between two checkpoints of a resumable copy
+RESUME_CHECKPOINT_CHUNKS = 8
+
+# Errors meaning "this method cannot be used here", as opposed to a real I/O failure
+UNSUPPORTED_ERRORS = {
+    errno.EINVAL, errno.ENOSYS, errno.EXDEV, errno.ENOTTY, errno.EBADF,
+    getattr(errno, "EOPNOTSUPP", errno.EINVAL), getattr(errno, "ENOTSUP", errno.EINVAL),
+    errno.EPERM,
+}
+
+_unsupported: Set[Tuple[str, int, int]] = set()
+_unsupported_lock = threading.Lock()
+
+
+class UnsupportedCopyMethod(Exception):
+    """Raised when a copy method is not available for a pair of files."""
+
+
+def _is_unsupported(method: str, devices: Tuple[int, int]) -> bool:
+    return (method, *devices) in _unsupported
+
+
+def _mark_unsupported(method: str, devices: Tuple[int, int]) -> None:
+    with _unsupported_lock:
+        _unsupported.add((method, *devices))
+
+
+def _reflink(fsrc: BinaryIO, fdst: BinaryIO, size: int) -> None:
+    """Clone the source extents into the destination (Btrfs, XFS, ...)."""
+    if fcntl is None or not sys.platform.startswith("linux"):
+        raise UnsupportedCopyMethod("reflink")
+    try:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    except OSError as e:
+        if e.errno in UNSUPPORTED_ERRORS:
+            raise UnsupportedCopyMethod("reflink") from e
+        raise
+
+
+def _copy_file_range(fsrc: BinaryIO, fdst: BinaryIO, size: int) -> None:
+    """Copy inside the kernel with copy_file_range(2)."""
+    if not hasattr(os, "copy_file_range"):
+        raise UnsupportedCopyMethod("copy_file_range")
+    copied = 0
+    while copied < size:
+        try:
+            sent = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+        except OSError as e:
+            if copied == 0 and e.errno in UNSUPPORTED_ERRORS:
+                raise UnsupportedCopyMethod("copy_file_range") from e
+            raise
+        if sent == 0:
+            if copied == 0:
+                # Some file systems report success without copying anything
+                raise UnsupportedCopyMethod("copy_file_range")
+            break
+        copied += sent
+
+
+def _sendfile(fsrc: BinaryIO, fdst: BinaryIO, size: int) -> None:
+    """Copy inside the kernel with sendfile(2); file targets are only supported on Linux."""
+    if not hasattr(os, "sendfile") or not sys.platform.startswith("linux"):
+        raise UnsupportedCopyMethod("sendfile")
+    copied = 0
+    while copied < size:
+        try:
+            sent = os.sendfile(fdst.fileno(), fsrc.fileno(), copied, min(size - copied, SENDFILE_CHUNK_SIZE))
+        except OSError as e:
+            if copied == 0 and e.errno in UNSUPPORTED_ERRORS:
+                raise UnsupportedCopyMethod("sendfile") from e
+            raise
+        if sent == 0:
+            if copied == 0:
+                # Some file systems report success without copying anything
+                raise UnsupportedCopyMethod("sendfile")
+            break
+        copied += sent
+
+
+KERNEL_METHODS = (
+    ("reflink", _reflink),
+    ("copy_file_range", _copy_file_range),
+    ("sendfile", _sendfile),
+)
+
+
+def temp_path_for(destination_path: str) -> str:
+    """Create an empty temporary file next to destination_path and return its path."""
+    directory, name = os.path.split(destination_path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=TEMP_SUFFIX, dir=directory or ".")
+    os.close(fd)
+    return tmp_path
+
+
+def publish(tmp_path: str, destination_path: str) -> None:
+    """Atomically move a finished temporary file into place."""
+    os.replace(tmp_path, destination_path)
+
+
+def discard(tmp_path: str) -> None:
+    """Remove a temporary file, ignoring errors."""
+    try:
+        os.remove(tmp_path)
+    except OSError:
+        pass
+
+
+def copy_file(source_path: str, destination_path: str) -> str:
+    """
+    Copy a file's content and metadata using the fastest available method.
+
+    The copy is written to a temporary file in the destination folder and
+    renamed over destination_path only once complete, so readers never see a
+    partially written file.
+
+    Args:
+        source_path: File to copy
+        destination_path: Path to write the copy to
+
+    Returns:
+        Name of the method that copied the content
+    """
+    tmp_path = temp_path_for(destination_path)
+    try:
+        method = copy_contents(source_path, tmp_path)
+        publish(tmp_path, destination_path)
+    except BaseException:
+        discard(tmp_path)
+        raise
+    return method
+
+
+def copy_contents(source_path: str, destination_path: str) -> str:
+    """
+    Copy a file's content and metadata in place using the fastest available method.
+
+    Reflink clones, copy_file_range and sendfile are tried in that order; a
+    method that fails as unsupported is remembered per pair of devices and not
+    tried again. shutil.copyfile, which has its own fast paths on macOS and
+    Windows, is the final fallback.
+
+    Args:
+        source_path: File to copy
+        destination_path: Path to write the copy to
+
+    Returns:
+        Name of the method that copied the content
+    """
+    method = "shutil"
+    with open(source_path, "rb") as fsrc:
+        source_stat = os.fstat(fsrc.fileno())
+        with open(destination_path, "wb") as fdst:
+            devices = (source_stat.st_dev, os.fstat(fdst.fileno()).st_dev)
+            for name, copy_method in KERNEL_METHODS:
+                if _is_unsupported(name, devices):
+                    continue
+                try:
+                    copy_method(fsrc, fdst, source_stat.st_size)
+                    method = name
+                    break
+                except UnsupportedCopyMethod:
+                    _mark_unsupported(name, devices)
+                    fdst.seek(0)
+                    fdst.truncate()
+                    fsrc.seek(0)
+
+    if method == "shutil":
+        shutil.copyfile(source_path, destination_path)
+    shutil.copystat(source_path, destination_path)
+    return method
+
+
+def link_existing(existing_path: str, destination_path: str) -> str:
+    """
+    Publish a file with the same content as existing_path without copying its bytes.
+
+    A reflink clone is preferred, as it shares the data blocks while keeping
+    the two files independent; a hard link is the fallback. Both only work
+    inside one file system, and the result is published atomically like
+    copy_file.
+
+    Args:
+        existing_path: File already holding the wanted content
+        destination_path: Path to publish the content at
+
+    Returns:
+        Name of the method used, 'reflink' or 'hardlink'
+
+    Raises:
+        OSError: If neither method is possible
+    """
+    tmp_path = temp_path_for(destination_path)
+    try:
+        try:
+            with open(existing_path, "rb") as fsrc, open(tmp_path, "wb") as fdst:
+                devices = (os.fstat(fsrc.fileno()).st_dev, os.fstat(fdst.fileno()).st_dev)
+                if _is_unsupported("reflink", devices):
+                    raise UnsupportedCopyMethod("reflink")
+                try:
+                    _reflink(fsrc, fdst, 0)
+                except UnsupportedCopyMethod:
+                    _mark_unsupported("reflink", devices)
+                    raise
+            shutil.copystat(existing_path, tmp_path)
+            method = "reflink"
+        except UnsupportedCopyMethod:
+            os.remove(tmp_path)
+            os.link(existing_path, tmp_path)
+            method = "hardlink"
+        publish(tmp_path, destination_path)
+    except BaseException:
+        discard(tmp_path)
+        raise
+    return method
+
+
+class _FanOutWriter:
+    """Writes chunks into one destination's temporary file on its own thread."""
+
+    def __init__(self, destination_path: str, max_pending: int):
+        self.destination_path = destination_path
+        self.tmp_path = temp_path_for(destination_path)
+        self.error: Optional[BaseException] = None
+        self._chunks: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=max_pending)
+        self._file = open(self.tmp_path, "wb")
+        self._thread = threading.Thread(target=self._run, name="FanOutWriter", daemon=True)
+        self._thread.start()
+
+    def put(self, chunk: Optional[bytes]) -> None:
+        self._chunks.put(chunk)
+
+    def finish(self) -> None:
+        self.put(None)
+        self._thread.join()
+        try:
+            self._file.close()
+        except OSError as e:
+            self.error = self.error or e
+
+    def _run(self) -> None:
+        while True:
+            chunk = self._chunks.get()
+            if chunk is None:
+                return
+            # After a failure keep draining so the reader is never blocked
+            if self.error is None:
+                try:
+                    self._file.write(chunk)
+                except BaseException as e:
+                    self.error = e
+
+
+def fan_out_copy(source_path: str, destination_paths: List[str],
+                 chunk_size: int = FAN_OUT_CHUNK_SIZE) -> Dict[str, Optional[BaseException]]:
+    """
+    Copy a file into several destinations while reading the source only once.
+
+    Each chunk read from the source is handed to one writer thread per
+    destination, so destinations are written in parallel. Each writer buffers
+    at most FAN_OUT_MAX_PENDING chunks, so reading is paced by the slowest
+    destination; a failing destination is dropped and does not affect the
+    others. Every destination is published atomically like copy_file.
+
+    Args:
+        source_path: File to copy
+        destination_paths: Paths to write the copies to
+        chunk_size: Size of each read from the source
+
+    Returns:
+        Mapping of each destination path to None on success or the error that occurred
+    """
+    results: Dict[str, Optional[BaseException]] = {}
+    writers = []
+    for destination_path in destination_paths:
+        try:
+            writers.append(_FanOutWriter(destination_path, FAN_OUT_MAX_PENDING))
+        except OSError as e:
+            results[destination_path] = e
+
+    try:
+        with open(source_path, "rb") as fsrc:
+            for chunk in iter(lambda: fsrc.read(chunk_size), b""):
+                for writer in writers:
+                    if writer.error is None:
+                        writer.put(chunk)
+    except BaseException:
+        for writer in writers:
+            writer.finish()
+            discard(writer.tmp_path)
+        raise
+
+    for writer in writers:
+        writer.finish()
+        if writer.error is None:
+            try:
+                shutil.copystat(source_path, writer.tmp_path)
+                publish(writer.tmp_path, writer.destination_path)
+            except OSError as e:
+                writer.error = e
+        if writer.error is not None:
+            discard(writer.tmp_path)
+        results[writer.destination_path] = writer.error
+    return results
+
+
+def resume_paths(destination_path: str) -> Tuple[str, str]:
+    """Get the partial file and checkpoint sidecar of a resumable copy to destination_path."""
+    directory, name = os.path.split(destination_path)
+    partial = os.path.join(directory, f".{name}.partial{TEMP_SUFFIX}")
+    sidecar = os.path.join(directory, f".{name}.chunks{TEMP_SUFFIX}")
+    return partial, sidecar
+
+
+def _chunk_digest(chunk: bytes) -> str:
+    return hashlib.blake2b(chunk, digest_size=16).hexdigest()
+
+
+def _source_identity(source_path: str, stat: os.stat_result, chunk_size: int) -> dict:
+    return {"source": os.path.abspath(source_path), "inode": stat.st_ino, "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns, "chunk_size": chunk_size}
+
+
+def _load_checkpoint(sidecar: str, identity: dict) -> List[str]:
+    """Get the digests of the verified chunks, or an empty list if the checkpoint is missing or stale."""
+    try:
+        with open(sidecar, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if data.get("identity") != identity:
+        return []
+    return list(data.get("chunks", []))
+
+
+def resumable_copy(source_path: str, destination_path: str, chunk_size: int = RESUME_CHUNK_SIZE,
+                   checkpoint_chunks: int = RESUME_CHECKPOINT_CHUNKS,
+                   progress: Optional[Callable[[int, int], None]] = None) -> str:
+    """
+    Copy a file in chunks with checkpoints, resuming an earlier interrupted copy.
+
+    The copy is written to a partial file next to destination_path. Every
+    checkpoint_chunks chunks the partial file is synced to disk and the
+    digests of the chunks written so far are saved to a sidecar file, so a
+    copy interrupted by a crash, sleep or Ctrl+C continues after the last
+    checkpoint instead of starting over. The last checkpointed chunk is
+    verified before resuming, and a source that changed since the checkpoint
+    is copied from the start. Only one chunk is held in memory at a time.
+
+    Args:
+        source_path: File to copy
+        destination_path: Path to publish the copy at
+        chunk_size: Size of each chunk
+        checkpoint_chunks: Chunks written between two checkpoints
+        progress: Called as progress(copied_bytes, total_bytes) at every checkpoint
+
+    Returns:
+        'chunked', or 'chunked (resumed)' when an earlier copy was continued
+
+    Raises:
+        OSError: If the source changed while being copied
+    """
+    partial, sidecar = resume_paths(destination_path)
+    with open(source_path, "rb") as fsrc:
+        stat = os.fstat(fsrc.fileno())
+        identity = _source_identity(source_path, stat, chunk_size)
+        chunks = _load_checkpoint(sidecar, identity) if os.path.exists(partial) else []
+        with open(partial, "r+b" if chunks else "wb") as fdst:
+            if chunks:
+                fdst.seek((len(chunks) - 1) * chunk_size)
+                if _chunk_digest(fdst.read(chunk_size)) != chunks[-1]:
+                    chunks = []
+            resumed = bool(chunks)
+            offset = len(chunks) * chunk_size
+            fdst.seek(offset)
+            fdst.truncate()
+            fsrc.seek(offset)
+
+            unsaved = 0
+            for chunk in iter(lambda: fsrc.read(chunk_size), b""):
+                fdst.write(chunk)
+                chunks.append(_chunk_digest(chunk))
+                offset += len(chunk)
+                unsaved += 1
+                if unsaved >= checkpoint_chunks:
+                    fdst.flush()
+                    os.fsync(fdst.fileno())
+                    write_json_atomic(sidecar, {"version": 1, "identity": identity, "chunks": chunks})
+                    unsaved = 0
+                    if progress is not None:
+                        progress(offset, stat.st_size)
+            fdst.flush()
+            os.fsync(fdst.fileno())
+
+    if _source_identity(source_path, os.stat(source_path), chunk_size) != identity:
+        discard(partial)
+        discard(sidecar)
+        raise OSError(f"'{source_path}' changed while being copied")
+    shutil.copystat(source_path, partial)
+    publish(partial, destination_path)
+    discard(sidecar)
+    return "chunked (resumed)" if resumed else "chunked"
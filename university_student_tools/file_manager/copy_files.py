@@ -2,31 +2,98 @@
 Module for handling file copying operations with monitoring capabilities
 """
 
+import asyncio
 import time
 import os
 import sys
 import shutil
-from typing import Union
+import argparse
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler, FileCreatedEvent, FileModifiedEvent
+from watchdog.events import (FileSystemEventHandler, FileCreatedEvent, FileModifiedEvent,
+                             FileSystemMovedEvent, FileSystemEvent)
+
+from .debounce import EventDebouncer
+from .workers import CopyWorkerPool
+from .copy_engine import copy_file as copy_with_fastest_method, fan_out_copy, resumable_copy
+from .stability import wait_until_stable
+from .retry_journal import RetryJournal
+from .filters import EventFilter
+from .polling import SnapshotPoller
+from .dedup import DedupIndex, HashCache
+from .metrics import CopyMetrics
+from ..runtime import every, run_blocking, run_monitors
+from .manifest import CopyManifest, default_state_path, file_hash, reconcile, scan_files
 
 class CustomHandler(FileSystemEventHandler):
     """Custom handler for Watchdog to handle file system events."""
 
-    def __init__(self, source_path: str, destination_path: str, retry_count: int = 3, retry_delay: int = 1):
+    def __init__(self, source_path: str, destination_path: Union[str, List[str]], retry_count: int = 3,
+                 retry_delay: int = 1, quiet_period: float = 1.0, pool: Optional[CopyWorkerPool] = None,
+                 manifests: Optional[Dict[str, CopyManifest]] = None, recursive: bool = False,
+                 journal_path: Optional[str] = None, event_filter: Optional[EventFilter] = None,
+                 dedup: Optional[Dict[str, DedupIndex]] = None, hash_cache: Optional[HashCache] = None,
+                 resume_threshold: Optional[int] = None, metrics: Optional[CopyMetrics] = None):
         """
         Initialize the handler with source and destination paths.
         
         Args:
             source_path: Path to monitor for changes
-            destination_path: Path to copy files to
-            retry_count: Number of times to retry failed copies
-            retry_delay: Delay between retry attempts in seconds
+            destination_path: Path, or list of paths, to copy files to
+            retry_count: Number of attempts before a failed copy is reported; without
+                a retry journal, the number of inline attempts before giving up
+            retry_delay: Delay before the first retry in seconds, doubled after each failure
+                when a retry journal is used
+            quiet_period: Seconds a file must go without events before it is copied
+            pool: Worker pool that runs the copies; copies run on the
+                debouncer thread when omitted
+            manifests: Manifest of copied files for each destination, used to
+                skip unchanged content
+            recursive: Mirror subfolders, keeping paths relative to source_path and
+                replaying folder creation, moves and deletions in the destination
+            journal_path: File persisting failed copies, which are then retried in the
+                background with exponential backoff instead of inline
+            event_filter: Include/exclude rules deciding which files are copied
+            dedup: Content index of each destination; content already present there
+                is reflinked or hard linked instead of copied
+            hash_cache: Cache of content hashes, so unchanged files are not hashed again
+            resume_threshold: Files of at least this many bytes are copied in checkpointed
+                chunks, so an interrupted copy resumes where it stopped
+            metrics: Collects latency, throughput, retry and failure metrics
         """
         self.source_path = source_path
-        self.destination_path = destination_path
+        if isinstance(destination_path, str):
+            destination_path = [destination_path]
+        self.destination_paths = list(destination_path)
+        self.destination_path = self.destination_paths[0]
         self.retry_count = retry_count
         self.retry_delay = retry_delay
+        self.pool = pool
+        self.manifests = manifests or {}
+        self.recursive = recursive
+        self.event_filter = event_filter
+        self.dedup = dedup or {}
+        self.hash_cache = hash_cache
+        self.resume_threshold = resume_threshold
+        self.metrics = metrics
+        self.journal = None
+        if journal_path is not None:
+            self.journal = RetryJournal(journal_path, self.retry_copy, base_delay=retry_delay,
+                                        warn_after=retry_count)
+            self.journal.start()
+        self.debouncer = EventDebouncer(self.schedule_copy, quiet_period)
+        self.debouncer.start()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of copies waiting for a worker."""
+        return self.pool.queue_depth if self.pool is not None else 0
+
+    def close(self) -> None:
+        """Schedule any files still waiting for their quiet period and stop the handler."""
+        self.debouncer.stop(flush=True)
+        if self.journal is not None:
+            self.journal.stop()
 
     def on_created(self, event: Union[FileCreatedEvent, FileModifiedEvent]) -> None:
         """Handle file creation events."""
@@ -36,76 +103,637 @@ class CustomHandler(FileSystemEventHandler):
         """Handle file modification events."""
         self.handle_event(event)
 
+    def on_moved(self, event: FileSystemMovedEvent) -> None:
+        """Handle file and folder moves, mirroring them in recursive mode."""
+        if not self.recursive:
+            if not event.is_directory and self.is_in_source(event.dest_path) and self.accepts(event.dest_path):
+                self.debouncer.touch(event.dest_path)
+            return
+
+        if not self.is_in_source(event.dest_path) or (not event.is_directory and not self.accepts(event.dest_path)):
+            self.mirror_delete(event.src_path)
+            return
+
+        if not event.is_directory and not self.accepts(event.src_path):
+            # Renamed from an ignored name (e.g. a partial download) to a copied one
+            self.debouncer.touch(event.dest_path)
+            return
+
+        old_key = self.relative_path(event.src_path)
+        new_key = self.relative_path(event.dest_path)
+        needs_copy = False
+        for destination_path in self.destination_paths:
+            old_destination = self.destination_for(event.src_path, destination_path)
+            new_destination = self.destination_for(event.dest_path, destination_path)
+            try:
+                os.makedirs(os.path.dirname(new_destination), exist_ok=True)
+                os.replace(old_destination, new_destination)
+            except OSError:
+                # Nothing was mirrored at the old path yet: copy the moved content instead
+                needs_copy = True
+                continue
+            if destination_path in self.manifests:
+                self.manifests[destination_path].rename(old_key, new_key)
+            print(f"Moved '{old_key}' to '{new_key}' in '{destination_path}'")
+
+        if needs_copy:
+            if event.is_directory:
+                now = time.monotonic()
+                for entry in scan_files(event.dest_path, recursive=True):
+                    if self.accepts(entry.path):
+                        self.schedule_copy(entry.path, now)
+            else:
+                self.debouncer.touch(event.dest_path)
+
+    def on_deleted(self, event: FileSystemEvent) -> None:
+        """Handle file and folder deletions, mirroring them in recursive mode."""
+        if self.recursive:
+            self.mirror_delete(event.src_path)
+
+    def accepts(self, file_path: str) -> bool:
+        """Check a source file against the include/exclude rules."""
+        if self.event_filter is None:
+            return True
+        return self.event_filter.allows(os.path.relpath(file_path, self.source_path))
+
+    def is_in_source(self, path: str) -> bool:
+        """Check whether path lies inside the monitored folder."""
+        try:
+            relative = os.path.relpath(path, self.source_path)
+        except ValueError:
+            # Different drive on Windows
+            return False
+        return relative != os.pardir and not relative.startswith(os.pardir + os.sep)
+
+    def relative_path(self, file_path: str) -> str:
+        """Get the manifest key of a source path."""
+        if self.recursive:
+            return os.path.relpath(file_path, self.source_path)
+        return os.path.basename(file_path)
+
+    def destination_for(self, file_path: str, destination_path: Optional[str] = None) -> str:
+        """Get the path a source file is copied to in a destination (the first one by default)."""
+        return os.path.join(destination_path or self.destination_path, self.relative_path(file_path))
+
+    def mirror_delete(self, path: str) -> None:
+        """
+        Remove the mirrored copies of a deleted source file or folder.
+
+        Args:
+            path: Source path that no longer exists
+        """
+        key = self.relative_path(path)
+        for destination_path in self.destination_paths:
+            destination = self.destination_for(path, destination_path)
+            try:
+                if os.path.isdir(destination) and not os.path.islink(destination):
+                    shutil.rmtree(destination)
+                else:
+                    os.remove(destination)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Failed to remove '{destination}': {e}")
+                continue
+            if destination_path in self.manifests:
+                self.manifests[destination_path].forget(key)
+            print(f"Removed '{key}' from '{destination_path}'")
+
     def handle_event(self, event: Union[FileCreatedEvent, FileModifiedEvent]) -> None:
         """
-        Handle file system events by copying files to destination.
+        Handle file system events by scheduling a copy to destination.
+
+        Bursts of events for the same file are coalesced into one copy that
+        runs once the file has been quiet for the configured period.
         
         Args:
             event: The file system event that occurred
         """
         if event.is_directory:
+            if self.recursive and event.event_type == "created":
+                for destination_path in self.destination_paths:
+                    os.makedirs(self.destination_for(event.src_path, destination_path), exist_ok=True)
             return
 
-        file_path = event.src_path
-        file_name = os.path.basename(file_path)
-        destination_file_path = os.path.join(self.destination_path, file_name)
+        if not self.accepts(event.src_path):
+            return
+        self.debouncer.touch(event.src_path)
+
+    def schedule_copy(self, file_path: str, last_event: float) -> None:
+        """
+        Hand a settled file to the worker pool, or copy it directly without a pool.
+
+        Args:
+            file_path: Path of the source file
+            last_event: time.monotonic() timestamp of the last event seen for the file
+        """
+        if self.pool is None:
+            self.copy_file(file_path, last_event)
+        else:
+            self.pool.submit(file_path, self.copy_file, file_path, last_event)
 
-        if os.path.exists(file_path):
-            for attempt in range(self.retry_count):
+    def outdated_destinations(self, file_path: str, stat: os.stat_result,
+                              destination_paths: Optional[List[str]] = None) -> List[str]:
+        """
+        Get the destinations that do not hold the current content of a file yet.
+
+        Args:
+            file_path: Path of the source file
+            stat: Stable os.stat() result of the source file
+            destination_paths: Destination folders to check (all by default)
+        """
+        key = self.relative_path(file_path)
+        outdated = []
+        for destination_path in destination_paths or self.destination_paths:
+            manifest = self.manifests.get(destination_path)
+            destination_file_path = self.destination_for(file_path, destination_path)
+            if manifest is None or not manifest.is_current(key, file_path, destination_file_path, stat):
+                outdated.append(destination_path)
+        return outdated
+
+    def copy_to_destinations(self, file_path: str,
+                             destination_paths: List[str]) -> Tuple[str, Dict[str, Optional[BaseException]]]:
+        """
+        Copy a file into several destinations.
+
+        A single destination uses the fastest copy method available; several
+        destinations are fed from one read of the source. Files above the
+        resume threshold are copied to each destination in checkpointed chunks
+        instead, as their checkpoints are kept per destination.
+
+        Args:
+            file_path: Path of the source file
+            destination_paths: Destination folders to copy into
+
+        Returns:
+            Name of the copy method used, and a mapping of each destination
+            folder to None on success or the error that occurred
+        """
+        targets = {self.destination_for(file_path, d): d for d in destination_paths}
+        for target in targets:
+            if self.recursive:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        if self.resume_threshold is not None and os.path.getsize(file_path) >= self.resume_threshold:
+            method, results = "chunked", {}
+            for target, destination_path in targets.items():
                 try:
-                    time.sleep(2)
-                    shutil.copy2(file_path, destination_file_path)
-                    print(f"Copied '{file_name}' to '{self.destination_path}'")
-                    break
+                    method = resumable_copy(file_path, target,
+                                            progress=self.progress_printer(file_path, destination_path))
+                    results[destination_path] = None
                 except Exception as e:
-                    print(f"Attempt {attempt + 1} to copy '{file_name}' failed: {e}")
-                    if attempt < self.retry_count - 1:
-                        time.sleep(self.retry_delay)
-                    else:
-                        print(f"Failed to copy '{file_name}' after {self.retry_count} attempts.")
+                    results[destination_path] = e
+            return method, results
+
+        if len(targets) == 1:
+            target = next(iter(targets))
+            try:
+                return copy_with_fastest_method(file_path, target), {targets[target]: None}
+            except Exception as e:
+                return "none", {targets[target]: e}
+
+        results = fan_out_copy(file_path, list(targets))
+        return "fan-out", {targets[target]: error for target, error in results.items()}
+
+    def content_hash(self, file_path: str, stat: os.stat_result) -> str:
+        """Get the content hash of a source file, from the hash cache when possible."""
+        if self.hash_cache is not None:
+            return self.hash_cache.get(file_path, stat)
+        return file_hash(file_path)
+
+    def link_duplicates(self, file_path: str, stat: os.stat_result, content_hash: str,
+                        destination_paths: List[str], latency: float) -> List[str]:
+        """
+        Publish a file in the destinations that already hold its content elsewhere.
+
+        Args:
+            file_path: Path of the source file
+            stat: Stable os.stat() result of the source file
+            content_hash: Content hash of the source file
+            destination_paths: Destination folders that need the file
+            latency: Seconds since the last event seen for the file
+
+        Returns:
+            Destination folders the file still has to be copied to
+        """
+        file_name = self.relative_path(file_path)
+        remaining = []
+        for destination_path in destination_paths:
+            index = self.dedup.get(destination_path)
+            method = None
+            if index is not None:
+                method = index.link(content_hash, self.destination_for(file_path, destination_path))
+            if method is None:
+                remaining.append(destination_path)
+                continue
+            if destination_path in self.manifests:
+                self.manifests[destination_path].record(file_name, stat, content_hash, method)
+            self.resolve_retry(file_path, destination_path)
+            if self.metrics is not None:
+                self.metrics.record_copy(method, latency, 0, 0.0)
+            print(f"Linked '{file_name}' in '{destination_path}' to identical content via {method} "
+                  f"({latency:.2f}s after last write)")
+        return remaining
+
+    def progress_printer(self, file_path: str, destination_path: str) -> Callable[[int, int], None]:
+        """Get a progress callback for a chunked copy that prints how far it got."""
+        file_name = self.relative_path(file_path)
+
+        def report(copied: int, total: int) -> None:
+            print(f"Copying '{file_name}' to '{destination_path}': {copied * 100 // max(total, 1)}% "
+                  f"({copied // 2 ** 20} of {total // 2 ** 20} MiB)")
+        return report
+
+    def retry_copy(self, file_path: str, destination_paths: List[str]) -> None:
+        """
+        Schedule another attempt at copies recorded in the retry journal.
+
+        Args:
+            file_path: Path of the source file
+            destination_paths: Destination folders the copy previously failed for
+        """
+        if self.metrics is not None:
+            self.metrics.record_retry(len(destination_paths))
+        if self.pool is None:
+            self.copy_file(file_path, time.monotonic(), destination_paths)
         else:
-            print(f"File '{file_path}' does not exist. Skipping copy.")
+            self.pool.submit(file_path, self.copy_file, file_path, time.monotonic(), destination_paths)
 
-def monitor_directory(source_path: str, destination_path: str) -> None:
+    def record_failure(self, file_path: str, destination_path: str, error: BaseException) -> None:
+        """Hand a failed copy to the retry journal."""
+        if self.metrics is not None:
+            self.metrics.record_failure()
+        if self.journal is not None:
+            self.journal.add_failure(file_path, destination_path, error)
+
+    def copy_file(self, file_path: str, last_event: float, destination_paths: Optional[List[str]] = None) -> None:
+        """
+        Copy a file to every destination that needs it.
+
+        With a retry journal each copy is attempted once and failed
+        destinations are retried later in the background; without one,
+        failed destinations are retried inline.
+
+        Args:
+            file_path: Path of the source file
+            last_event: time.monotonic() timestamp of the last event seen for the file
+            destination_paths: Only copy to these destination folders (all by default)
+        """
+        file_name = self.relative_path(file_path)
+        candidates = destination_paths or self.destination_paths
+
+        try:
+            stat = wait_until_stable(file_path)
+            if stat is None:
+                print(f"File '{file_path}' does not exist. Skipping copy.")
+                for destination_path in candidates:
+                    self.resolve_retry(file_path, destination_path)
+                return
+            pending = self.outdated_destinations(file_path, stat, candidates)
+            for destination_path in candidates:
+                if destination_path not in pending:
+                    self.resolve_retry(file_path, destination_path)
+            if not pending:
+                print(f"Skipped '{file_name}': content unchanged since last copy")
+                return
+            use_hash = any(self.manifests[d].use_hash for d in pending if d in self.manifests)
+            content_hash = self.content_hash(file_path, stat) if use_hash or self.dedup else None
+            if self.dedup:
+                if self.recursive:
+                    for destination_path in pending:
+                        os.makedirs(os.path.dirname(self.destination_for(file_path, destination_path)),
+                                    exist_ok=True)
+                pending = self.link_duplicates(file_path, stat, content_hash, pending,
+                                               time.monotonic() - last_event)
+                if not pending:
+                    return
+        except (TimeoutError, OSError) as e:
+            print(f"Could not copy '{file_name}': {e}")
+            if not isinstance(e, TimeoutError):
+                for destination_path in candidates:
+                    self.record_failure(file_path, destination_path, e)
+            return
+
+        attempts = 1 if self.journal is not None else self.retry_count
+        for attempt in range(attempts):
+            if attempt and self.metrics is not None:
+                self.metrics.record_retry(len(pending))
+            started = time.monotonic()
+            try:
+                method, results = self.copy_to_destinations(file_path, pending)
+            except Exception as e:
+                method, results = "none", {d: e for d in pending}
+            finished = time.monotonic()
+            latency = finished - last_event
+            if self.dedup and content_hash is not None and self.source_unchanged(file_path, stat):
+                for destination_path, error in results.items():
+                    if error is None and destination_path in self.dedup:
+                        self.dedup[destination_path].record(self.destination_for(file_path, destination_path),
+                                                            content_hash)
+
+            failed = []
+            for destination_path, error in results.items():
+                if error is None:
+                    if destination_path in self.manifests:
+                        self.manifests[destination_path].record(file_name, stat, content_hash, method)
+                    self.resolve_retry(file_path, destination_path)
+                    if self.metrics is not None:
+                        self.metrics.record_copy(method, latency, stat.st_size, finished - started)
+                    print(f"Copied '{file_name}' to '{destination_path}' via {method} "
+                          f"({latency:.2f}s after last write)")
+                else:
+                    print(f"Attempt {attempt + 1} to copy '{file_name}' to '{destination_path}' failed: {error}")
+                    failed.append(destination_path)
+                    self.record_failure(file_path, destination_path, error)
+
+            pending = failed
+            if not pending or self.journal is not None:
+                break
+            if attempt < attempts - 1:
+                time.sleep(self.retry_delay)
+            else:
+                for destination_path in pending:
+                    print(f"Failed to copy '{file_name}' to '{destination_path}' after {attempts} attempts.")
+
+    @staticmethod
+    def source_unchanged(file_path: str, stat: os.stat_result) -> bool:
+        """Check that a file still matches the os.stat() result it was hashed with."""
+        try:
+            current = os.stat(file_path)
+        except OSError:
+            return False
+        return (current.st_ino, current.st_size, current.st_mtime_ns) == (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def resolve_retry(self, file_path: str, destination_path: str) -> None:
+        """Drop a copy from the retry journal once it is no longer needed."""
+        if self.journal is not None:
+            self.journal.resolve(file_path, destination_path)
+
+def initial_sync(handler: CustomHandler) -> None:
+    """
+    Copy the files that changed while the monitor was not running.
+
+    Args:
+        handler: Handler whose manifests and copy path are used
     """
-    Monitor a directory for changes and copy files to destination.
+    accept = None
+    if handler.event_filter is not None:
+        accept = lambda relative_path: handler.event_filter.matching_rule(relative_path) is None
+    changed = set()
+    for destination_path, manifest in handler.manifests.items():
+        changed.update(reconcile(handler.source_path, destination_path, manifest,
+                                 recursive=handler.recursive, accept=accept))
+    print(f"Startup sync: {len(changed)} file(s) changed since the last run")
+    now = time.monotonic()
+    for file_path in sorted(changed):
+        handler.schedule_copy(file_path, now)
+
+def manifest_path_for(manifest_path: Optional[str], source_path: str, destination_path: str,
+                      index: int, count: int) -> str:
+    """Get the manifest file of one destination, numbering an explicit path when there are several."""
+    if manifest_path is None:
+        return default_state_path("manifest", source_path, destination_path)
+    if count == 1:
+        return manifest_path
+    root, ext = os.path.splitext(manifest_path)
+    return f"{root}.{index}{ext}"
+
+async def watch_directory(source_path: str, destination_path: Union[str, List[str]], quiet_period: float = 1.0,
+                          workers: int = 4, manifest_path: Optional[str] = None,
+                          use_manifest: bool = True, use_hash: bool = False,
+                          recursive: bool = False, journal_path: Optional[str] = None,
+                          event_filter: Optional[EventFilter] = None, poll_interval: Optional[float] = None,
+                          poll_batch: int = 10000, dedup: bool = False,
+                          resume_threshold: Optional[int] = None, metrics_dir: Optional[str] = None,
+                          metrics_interval: float = 10.0) -> None:
+    """
+    Monitor a directory for changes and copy files to destination until cancelled.
+
+    The watcher, worker pool and background threads are stopped and all
+    state is saved when the task is cancelled, so several monitors can run
+    as tasks of one shared event loop.
     
     Args:
         source_path: Path to monitor for changes
-        destination_path: Path to copy files to
+        destination_path: Path, or list of paths, to copy files to
+        quiet_period: Seconds a file must go without events before it is copied
+        workers: Number of files copied in parallel
+        manifest_path: Where to persist the manifest of copied files; defaults
+            to a file per destination in the user's state directory
+        use_manifest: Sync changes made while not running and skip unchanged content
+        use_hash: Compare content hashes when only the modification time changed
+        recursive: Mirror the whole source tree instead of only its top-level files
+        journal_path: Where to persist failed copies for background retries; defaults
+            to a file in the user's state directory
+        event_filter: Include/exclude rules deciding which files are copied
+        poll_interval: Detect changes by rescanning the source every poll_interval
+            seconds instead of waiting for file system events (network and synced mounts)
+        poll_batch: Directory entries checked per poll when polling
+        dedup: Reflink or hard link content already present in a destination
+            instead of copying it again
+        resume_threshold: Copy files of at least this many bytes in checkpointed
+            chunks that resume after an interruption
+        metrics_dir: Folder a JSON and a Prometheus text file with copy metrics are
+            written to; no metrics are collected when omitted
+        metrics_interval: Seconds between two rewrites of the metrics files
+    """
+    destination_paths = [destination_path] if isinstance(destination_path, str) else list(destination_path)
+    journal_path = journal_path or default_state_path("retries", source_path, *destination_paths)
+    manifests = {}
+    if use_manifest:
+        for index, path in enumerate(destination_paths):
+            path_of_manifest = manifest_path_for(manifest_path, source_path, path, index, len(destination_paths))
+            manifests[path] = CopyManifest(path_of_manifest, use_hash=use_hash)
+
+    hash_cache = None
+    dedup_indexes = {}
+    if dedup:
+        hash_cache = HashCache(default_state_path("hashes", source_path, *destination_paths))
+        for path in destination_paths:
+            dedup_indexes[path] = DedupIndex(path, hash_cache, recursive=recursive)
+            await run_blocking(dedup_indexes[path].scan)
+
+    metrics = CopyMetrics(metrics_dir, metrics_interval) if metrics_dir is not None else None
+
+    pool = CopyWorkerPool(workers)
+    pool.start()
+    handler = CustomHandler(source_path, destination_paths, quiet_period=quiet_period, pool=pool,
+                            manifests=manifests, recursive=recursive, journal_path=journal_path,
+                            event_filter=event_filter, dedup=dedup_indexes, hash_cache=hash_cache,
+                            resume_threshold=resume_threshold, metrics=metrics)
+    if poll_interval is not None:
+        observer = SnapshotPoller(handler, source_path, recursive=recursive, interval=poll_interval,
+                                  max_entries=poll_batch)
+    else:
+        observer = Observer()
+        observer.schedule(handler, path=source_path, recursive=recursive)
+    # Both walk the source tree on start, which can take a while on large or network folders
+    await run_blocking(observer.start)
+
+    def save_state() -> None:
+        for manifest in manifests.values():
+            manifest.save_if_due()
+        if hash_cache is not None:
+            hash_cache.save_if_due()
+        if metrics is not None:
+            metrics.export_if_due(handler.queue_depth)
+
+    try:
+        # Scan after the observer started so no change falls between the two
+        if manifests:
+            await run_blocking(initial_sync, handler)
+        # Saving writes whole JSON files, so it runs off the loop shared with other monitors
+        await every(1.0, run_blocking, save_state)
+    finally:
+        await stop_monitor(observer, handler, pool, manifests, metrics, hash_cache, dedup_indexes)
+
+async def stop_monitor(observer: Union[Observer, SnapshotPoller], handler: CustomHandler,
+                       pool: CopyWorkerPool, manifests: Dict[str, CopyManifest],
+                       metrics: Optional[CopyMetrics], hash_cache: Optional[HashCache],
+                       dedup_indexes: Dict[str, DedupIndex]) -> None:
     """
-    observer = Observer()
-    handler = CustomHandler(source_path, destination_path)
-    observer.schedule(handler, path=source_path, recursive=False)
-    observer.start()
+    Finish the queued copies, save all state and print what happened.
 
+    Waiting happens off the event loop, so other monitors keep running, and
+    cancelling the wait (a second Ctrl+C) still saves the state; the copies
+    left are synced on the next start.
+    """
+    observer.stop()
     try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        observer.stop()
-    observer.join()
+        await run_blocking(observer.join)
+        await run_blocking(handler.close)
+        if handler.queue_depth:
+            print(f"Waiting for {handler.queue_depth} queued copies to finish...")
+        pool.stop(wait=False)
+        while pool.is_alive():
+            await asyncio.sleep(0.1)
+    finally:
+        save_monitor_state(handler, manifests, metrics, hash_cache, dedup_indexes)
+
+def save_monitor_state(handler: CustomHandler, manifests: Dict[str, CopyManifest],
+                       metrics: Optional[CopyMetrics], hash_cache: Optional[HashCache],
+                       dedup_indexes: Dict[str, DedupIndex]) -> None:
+    """Save all state of a stopped monitor and print what happened."""
+    event_filter = handler.event_filter
+    if event_filter is not None and event_filter.dropped:
+        print("Ignored events by rule:")
+        for line in event_filter.report():
+            print(f"  {line}")
+    if handler.journal is not None and len(handler.journal):
+        print(f"{len(handler.journal)} failed copy(ies) will be retried on the next start")
+    for manifest in manifests.values():
+        manifest.save()
+    if metrics is not None:
+        metrics.export(handler.queue_depth)
+        summary = metrics.summary()
+        print(f"Copied {summary['copies']} file(s), {summary['bytes'] / 2 ** 20:.1f} MiB at "
+              f"{summary['bytes_per_second'] / 2 ** 20:.1f} MiB/s, {summary['average_latency']:.2f}s average "
+              f"latency, {summary['retries']} retry(ies), {summary['failures']} failure(s)")
+    if hash_cache is not None:
+        hash_cache.save()
+        linked = sum(index.linked for index in dedup_indexes.values())
+        if linked:
+            print(f"Dedup: {linked} copy(ies) replaced by links to identical content")
+
+def monitor_directory(source_path: str, destination_path: Union[str, List[str]], **options) -> None:
+    """
+    Monitor a directory for changes and copy files to destination until interrupted.
+
+    Runs watch_directory on its own event loop; see watch_directory for the options.
+    """
+    run_monitors(watch_directory(source_path, destination_path, **options))
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m university_student_tools.file_manager.copy_files",
+        description="Monitor a directory and copy changed files to a destination.",
+    )
+    parser.add_argument("source_path", help="Path to monitor for changes")
+    parser.add_argument("destination_paths", nargs="+", metavar="destination_path",
+                        help="One or more paths to copy files to; each source file is read once")
+    parser.add_argument("--quiet-period", type=float, default=1.0,
+                        help="Seconds a file must go without events before it is copied (default: 1.0)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Number of files copied in parallel (default: 4)")
+    parser.add_argument("--manifest", dest="manifest_path",
+                        help="Path of the manifest of copied files, numbered per destination when there are "
+                             "several (default: in ~/.university_student_tools)")
+    parser.add_argument("--no-manifest", dest="use_manifest", action="store_false",
+                        help="Disable the startup sync and unchanged-content checks")
+    parser.add_argument("--hash", dest="use_hash", action="store_true",
+                        help="Compare content hashes when only the modification time changed")
+    parser.add_argument("--retry-journal", dest="journal_path",
+                        help="Path of the journal of failed copies (default: in ~/.university_student_tools)")
+    parser.add_argument("--include", action="append", default=[], metavar="GLOB",
+                        help="Only copy files matching this pattern (repeatable)")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                        help="Never copy files matching this pattern (repeatable)")
+    parser.add_argument("--filter-file",
+                        help='JSON file with "include" and "exclude" pattern lists')
+    parser.add_argument("--no-default-excludes", dest="default_excludes", action="store_false",
+                        help="Also copy swap, lock, partial download and LaTeX by-product files")
+    parser.add_argument("--poll", action="store_true",
+                        help="Detect changes by rescanning the source instead of waiting for file system "
+                             "events; for SMB/NFS mounts and cloud-sync folders")
+    parser.add_argument("--poll-interval", type=float, default=2.0, metavar="SECONDS",
+                        help="Seconds between rescans with --poll (default: 2.0)")
+    parser.add_argument("--poll-batch", type=int, default=10000, metavar="N",
+                        help="Directory entries checked per poll; larger folders are rescanned over "
+                             "several polls (default: 10000)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Reflink or hard link content already present in a destination instead of "
+                             "copying it again")
+    parser.add_argument("--resumable-above", type=float, metavar="MIB",
+                        help="Copy files of at least MIB mebibytes in checkpointed chunks, so an interrupted "
+                             "copy resumes where it stopped")
+    parser.add_argument("--metrics-dir",
+                        help="Folder to periodically write copy_files.json and copy_files.prom metrics to")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, metavar="SECONDS",
+                        help="Seconds between two rewrites of the metrics files (default: 10.0)")
+    parser.add_argument("--recursive", action="store_true",
+                        help="Mirror subfolders, keeping relative paths and replaying folder moves and deletions")
+    return parser.parse_args(argv)
 
 def main():
     """Main entry point for the script."""
-    if len(sys.argv) < 3:
-        print("Usage: python -m university_student_tools.file_manager.copy_files /path/to/source /path/to/destination")
-        sys.exit(1)
-
-    source_path = sys.argv[1]
-    destination_path = sys.argv[2]
+    args = parse_args()
+    source_path = args.source_path
+    destination_paths = args.destination_paths
 
     if not os.path.isdir(source_path):
         print(f"The path '{source_path}' is not a valid directory.")
         sys.exit(1)
 
-    if not os.path.isdir(destination_path):
-        print(f"The path '{destination_path}' is not a valid directory.")
+    for destination_path in destination_paths:
+        if not os.path.isdir(destination_path):
+            print(f"The path '{destination_path}' is not a valid directory.")
+            sys.exit(1)
+
+    try:
+        if args.filter_file:
+            event_filter = EventFilter.from_file(args.filter_file, args.include, args.exclude,
+                                                 default_excludes=args.default_excludes)
+        else:
+            event_filter = EventFilter(args.include, args.exclude, default_excludes=args.default_excludes)
+    except (OSError, ValueError) as e:
+        print(f"Could not load filter file '{args.filter_file}': {e}")
         sys.exit(1)
 
+    resume_threshold = None
+    if args.resumable_above is not None:
+        resume_threshold = int(args.resumable_above * 2 ** 20)
+
     print(f"Monitoring directory: {source_path}")
-    print(f"Files will be copied to: {destination_path}")
-    monitor_directory(source_path, destination_path)
+    print(f"Files will be copied to: {', '.join(destination_paths)}")
+    monitor_directory(source_path, destination_paths, quiet_period=args.quiet_period,
+                      workers=args.workers, manifest_path=args.manifest_path,
+                      use_manifest=args.use_manifest, use_hash=args.use_hash,
+                      recursive=args.recursive, journal_path=args.journal_path,
+                      event_filter=event_filter,
+                      poll_interval=args.poll_interval if args.poll else None,
+                      poll_batch=args.poll_batch, dedup=args.dedup, resume_threshold=resume_threshold,
+                      metrics_dir=args.metrics_dir, metrics_interval=args.metrics_interval)
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
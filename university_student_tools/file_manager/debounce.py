@@ -0,0 +1,113 @@
+"""
+Module for coalescing bursts of file system events into a single action
+"""
+
+import heapq
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+
+class EventDebouncer:
+    """Group events per key and fire one callback once the key has been quiet."""
+
+    def __init__(self, callback: Callable[[str, float], None], quiet_period: float = 1.0):
+        """
+        Initialize the debouncer.
+
+        Args:
+            callback: Called as callback(key, last_event_time) once a key has
+                seen no new events for quiet_period seconds. last_event_time
+                is a time.monotonic() timestamp.
+            quiet_period: Seconds without events before a key is flushed
+        """
+        self.callback = callback
+        self.quiet_period = quiet_period
+        self._pending: Dict[str, Tuple[float, float]] = {}
+        self._deadlines: List[Tuple[float, str]] = []
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="EventDebouncer", daemon=True)
+
+    @property
+    def pending_count(self) -> int:
+        """Number of keys waiting for their quiet period to expire."""
+        with self._condition:
+            return len(self._pending)
+
+    def start(self) -> None:
+        """Start the background flushing thread."""
+        self._thread.start()
+
+    def touch(self, key: str) -> None:
+        """
+        Record an event for key, pushing its flush back by quiet_period.
+
+        Args:
+            key: Identifier of the event source, usually a file path
+        """
+        now = time.monotonic()
+        with self._condition:
+            deadline = now + self.quiet_period
+            self._pending[key] = (deadline, now)
+            heapq.heappush(self._deadlines, (deadline, key))
+            self._condition.notify()
+
+    def stop(self, flush: bool = True) -> None:
+        """
+        Stop the flushing thread.
+
+        Args:
+            flush: Fire the callback for every pending key before returning
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread.is_alive():
+            self._thread.join()
+
+        if flush:
+            with self._condition:
+                pending = [(key, last_event) for key, (_, last_event) in self._pending.items()]
+                self._pending.clear()
+                self._deadlines.clear()
+            for key, last_event in pending:
+                self._fire(key, last_event)
+
+    def _pop_expired(self, now: float) -> List[Tuple[str, float]]:
+        """Remove and return every key whose quiet period has elapsed."""
+        expired = []
+        while self._deadlines and self._deadlines[0][0] <= now:
+            deadline, key = heapq.heappop(self._deadlines)
+            entry = self._pending.get(key)
+            # Stale heap entries are left behind whenever a key is touched again
+            if entry is not None and entry[0] == deadline:
+                del self._pending[key]
+                expired.append((key, entry[1]))
+        return expired
+
+    def _run(self) -> None:
+        """Wait for deadlines to expire and fire their callbacks."""
+        while True:
+            with self._condition:
+                while not self._stopping:
+                    if not self._deadlines:
+                        self._condition.wait()
+                        continue
+                    delay = self._deadlines[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                if self._stopping:
+                    return
+                expired = self._pop_expired(time.monotonic())
+
+            for key, last_event in expired:
+                self._fire(key, last_event)
+
+    def _fire(self, key: str, last_event: float) -> None:
+        """Run the callback, keeping the flushing thread alive on errors."""
+        try:
+            self.callback(key, last_event)
+        except Exception as e:
+            print(f"An error occurred while handling '{key}': {e}")
@@ -0,0 +1,195 @@
+"""
+Module for reusing identical content already present in a destination folder
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from .copy_engine import TEMP_SUFFIX, link_existing
+from .manifest import file_hash, scan_files, write_json_atomic
+
+
+class HashCache:
+    """
+    Persisted content hashes keyed by path and validated by (inode, size, mtime).
+
+    A file is only hashed again once its inode, size or modification time
+    changed, so restarting the monitor does not re-read unchanged files.
+    """
+
+    def __init__(self, cache_path: str):
+        """
+        Initialize the cache, loading it from disk if it exists.
+
+        Args:
+            cache_path: JSON file the cache is persisted to
+        """
+        self.cache_path = cache_path
+        self.entries: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self.load()
+
+    def load(self) -> None:
+        """Load entries from disk, starting empty if the file is missing or corrupt."""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("files", {})
+        except FileNotFoundError:
+            self.entries = {}
+        except (ValueError, OSError) as e:
+            print(f"Ignoring unreadable hash cache '{self.cache_path}': {e}")
+            self.entries = {}
+
+    def save(self) -> None:
+        """Write the cache to disk if it has changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": 1, "files": dict(self.entries)}
+            self._dirty = False
+            self._last_save = time.monotonic()
+        try:
+            write_json_atomic(self.cache_path, data)
+        except OSError as e:
+            print(f"Failed to save hash cache '{self.cache_path}': {e}")
+            with self._lock:
+                self._dirty = True
+
+    def save_if_due(self, interval: float = 10.0) -> None:
+        """Save the cache if it has changed and interval seconds passed since the last save."""
+        if self._dirty and time.monotonic() - self._last_save >= interval:
+            self.save()
+
+    def lookup(self, file_path: str, stat: os.stat_result) -> Optional[str]:
+        """Get the cached hash of a file, or None if the file changed since it was hashed."""
+        entry = self.entries.get(os.path.abspath(file_path))
+        if entry is None or entry[:3] != [stat.st_ino, stat.st_size, stat.st_mtime_ns]:
+            return None
+        return entry[3]
+
+    def store(self, file_path: str, stat: os.stat_result, content_hash: str) -> None:
+        """Remember the hash of a file in the state described by stat."""
+        with self._lock:
+            self.entries[os.path.abspath(file_path)] = [stat.st_ino, stat.st_size, stat.st_mtime_ns, content_hash]
+            self._dirty = True
+
+    def get(self, file_path: str, stat: Optional[os.stat_result] = None) -> str:
+        """
+        Get the content hash of a file, hashing it only if it changed.
+
+        Args:
+            file_path: File to hash
+            stat: Already known os.stat() result of file_path
+        """
+        if stat is None:
+            stat = os.stat(file_path)
+        content_hash = self.lookup(file_path, stat)
+        if content_hash is None:
+            content_hash = file_hash(file_path)
+            self.store(file_path, stat, content_hash)
+        return content_hash
+
+
+class DedupIndex:
+    """
+    Index of the content hashes present in one destination folder.
+
+    Before a file is copied, the index is asked for a destination file with
+    the same content; if there is one, it is reflinked or hard linked instead
+    of copying the bytes again. Entries are verified against the hash cache
+    when used, so files changed or removed behind the monitor's back are
+    dropped lazily.
+    """
+
+    def __init__(self, destination_path: str, cache: HashCache, recursive: bool = False):
+        """
+        Initialize the index.
+
+        Args:
+            destination_path: Destination folder to index
+            cache: Hash cache shared with the source files
+            recursive: Also index files in subfolders
+        """
+        self.destination_path = destination_path
+        self.cache = cache
+        self.recursive = recursive
+        self.linked = 0
+        self._paths: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def scan(self) -> None:
+        """Hash the files already in the destination, reusing cached hashes."""
+        count = 0
+        for entry in scan_files(self.destination_path, self.recursive):
+            if entry.name.endswith(TEMP_SUFFIX):
+                continue
+            try:
+                self.add(entry.path, self.cache.get(entry.path, entry.stat()))
+            except OSError:
+                # The file disappeared while scanning
+                continue
+            count += 1
+        print(f"Dedup index: {count} file(s) in '{self.destination_path}'")
+
+    def add(self, file_path: str, content_hash: str) -> None:
+        """Register a destination file holding content_hash."""
+        with self._lock:
+            self._paths.setdefault(content_hash, set()).add(file_path)
+
+    def record(self, file_path: str, content_hash: str) -> None:
+        """Register a destination file that was just written with content_hash."""
+        try:
+            self.cache.store(file_path, os.stat(file_path), content_hash)
+        except OSError:
+            return
+        self.add(file_path, content_hash)
+
+    def find(self, content_hash: str) -> Optional[str]:
+        """
+        Get a destination file that still holds content_hash.
+
+        Returns:
+            Path of the file, or None if the content is not in the destination
+        """
+        with self._lock:
+            candidates = list(self._paths.get(content_hash, ()))
+        for file_path in candidates:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                stat = None
+            if stat is not None and self.cache.lookup(file_path, stat) == content_hash:
+                return file_path
+            with self._lock:
+                self._paths.get(content_hash, set()).discard(file_path)
+        return None
+
+    def link(self, content_hash: str, destination_file_path: str) -> Optional[str]:
+        """
+        Publish content already present in the destination at a new path.
+
+        Args:
+            content_hash: Hash of the wanted content
+            destination_file_path: Path to publish the content at
+
+        Returns:
+            Name of the method used, or None if the content must be copied
+        """
+        existing = self.find(content_hash)
+        if existing is None:
+            return None
+        if os.path.abspath(existing) == os.path.abspath(destination_file_path):
+            return "unchanged"
+        try:
+            method = link_existing(existing, destination_file_path)
+        except OSError:
+            return None
+        self.record(destination_file_path, content_hash)
+        with self._lock:
+            self.linked += 1
+        return method
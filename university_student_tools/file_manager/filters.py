@@ -0,0 +1,112 @@
+"""
+Module for deciding which files in the watched folder are worth copying
+"""
+
+import fnmatch
+import json
+import os
+import re
+import threading
+from collections import Counter
+from typing import Iterable, List, Optional, Pattern, Tuple
+
+from .copy_engine import TEMP_SUFFIX
+
+# Editor swap files, Office lock files, partial downloads, LaTeX by-products and our own temp files
+DEFAULT_EXCLUDES = [
+    "*.swp", "*.swo", "*~", ".#*", "~$*", "*.tmp", "*.part", "*.crdownload",
+    "*.aux", "*.log", "*.synctex.gz", "*.fls", "*.fdb_latexmk", "*.out", "*.toc",
+    ".DS_Store", "Thumbs.db", f"*{TEMP_SUFFIX}",
+]
+
+NO_INCLUDE_MATCH = "(not included)"
+
+
+def _compile(pattern: str) -> Tuple[str, Pattern, bool]:
+    """Compile a glob; patterns containing '/' match the relative path, others the file name."""
+    on_path = "/" in pattern
+    # normcase also turns '/' into backslashes on Windows, while paths are matched with '/' separators
+    normalized = os.path.normcase(pattern.replace("/", os.sep)).replace(os.sep, "/")
+    return pattern, re.compile(fnmatch.translate(normalized)), on_path
+
+
+class EventFilter:
+    """Include/exclude glob rules compiled once and counted per rule."""
+
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = (),
+                 default_excludes: bool = True):
+        """
+        Initialize the filter.
+
+        A file is copied if it matches no exclude rule and, when include
+        rules are given, at least one include rule.
+
+        Args:
+            include: Glob patterns of files to copy
+            exclude: Glob patterns of files to ignore
+            default_excludes: Also ignore DEFAULT_EXCLUDES
+        """
+        excludes = list(exclude)
+        if default_excludes:
+            excludes = DEFAULT_EXCLUDES + excludes
+        self.include = [_compile(p) for p in include]
+        self.exclude = [_compile(p) for p in excludes]
+        self.dropped: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, config_path: str, include: Iterable[str] = (), exclude: Iterable[str] = (),
+                  default_excludes: bool = True) -> "EventFilter":
+        """
+        Create a filter from a JSON file of the form {"include": [...], "exclude": [...]}.
+
+        Args:
+            config_path: Path of the JSON file
+            include: Extra include patterns, e.g. from the command line
+            exclude: Extra exclude patterns, e.g. from the command line
+            default_excludes: Also ignore DEFAULT_EXCLUDES
+        """
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        return cls(list(config.get("include", [])) + list(include),
+                   list(config.get("exclude", [])) + list(exclude),
+                   default_excludes=config.get("default_excludes", default_excludes))
+
+    def matching_rule(self, relative_path: str) -> Optional[str]:
+        """
+        Get the rule that drops a file, without counting it.
+
+        Args:
+            relative_path: Path of the file relative to the watched folder
+
+        Returns:
+            The exclude pattern that matched, NO_INCLUDE_MATCH, or None if the file is copied
+        """
+        path = os.path.normcase(relative_path).replace(os.sep, "/")
+        name = path.rsplit("/", 1)[-1]
+        for pattern, regex, on_path in self.exclude:
+            if regex.match(path if on_path else name):
+                return pattern
+        if self.include and not any(regex.match(path if on_path else name)
+                                    for _, regex, on_path in self.include):
+            return NO_INCLUDE_MATCH
+        return None
+
+    def allows(self, relative_path: str) -> bool:
+        """
+        Check whether a file should be copied, counting it against the rule that drops it.
+
+        Args:
+            relative_path: Path of the file relative to the watched folder
+        """
+        rule = self.matching_rule(relative_path)
+        if rule is None:
+            return True
+        with self._lock:
+            self.dropped[rule] += 1
+        return False
+
+    def report(self) -> List[str]:
+        """Get one line per rule that dropped events, most frequent first."""
+        with self._lock:
+            return [f"{pattern}: {count} event(s) dropped" for pattern, count in self.dropped.most_common()]
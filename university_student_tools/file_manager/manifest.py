@@ -0,0 +1,247 @@
+"""
+Module for tracking which source files have already been copied
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+STATE_DIR = os.path.join(os.path.expanduser("~"), ".university_student_tools", "copy_files")
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def default_state_path(kind: str, *paths: str) -> str:
+    """
+    Get the path of a per-monitor state file kept outside the watched folders.
+
+    Args:
+        kind: Type of state, used as file suffix (e.g. 'manifest')
+        *paths: Paths identifying the monitor, usually source and destination
+
+    Returns:
+        Path of the state file in the user's state directory
+    """
+    key = "\0".join(os.path.abspath(p) for p in paths)
+    digest = hashlib.sha1(key.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+    return os.path.join(STATE_DIR, f"{digest}-{kind}.json")
+
+
+def file_hash(file_path: str) -> str:
+    """Compute the BLAKE2b digest of a file, reading it in chunks."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_json_atomic(file_path: str, data) -> None:
+    """Write data as JSON, replacing file_path atomically."""
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, file_path)
+
+
+class CopyManifest:
+    """Persisted record of the (size, mtime, hash) of every copied source file."""
+
+    def __init__(self, manifest_path: str, use_hash: bool = False):
+        """
+        Initialize the manifest, loading it from disk if it exists.
+
+        Args:
+            manifest_path: JSON file the manifest is persisted to
+            use_hash: Compare content hashes when size matches but mtime differs,
+                so touched-but-identical files are not copied again
+        """
+        self.manifest_path = manifest_path
+        self.use_hash = use_hash
+        self.entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self.load()
+
+    def load(self) -> None:
+        """Load entries from disk, starting empty if the file is missing or corrupt."""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("files", {})
+        except FileNotFoundError:
+            self.entries = {}
+        except (ValueError, OSError) as e:
+            print(f"Ignoring unreadable manifest '{self.manifest_path}': {e}")
+            self.entries = {}
+
+    def save(self) -> None:
+        """Write the manifest to disk if it has changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": 1, "files": dict(self.entries)}
+            self._dirty = False
+            self._last_save = time.monotonic()
+        try:
+            write_json_atomic(self.manifest_path, data)
+        except OSError as e:
+            print(f"Failed to save manifest '{self.manifest_path}': {e}")
+            with self._lock:
+                self._dirty = True
+
+    def save_if_due(self, interval: float = 10.0) -> None:
+        """Save the manifest if it has changed and interval seconds passed since the last save."""
+        if self._dirty and time.monotonic() - self._last_save >= interval:
+            self.save()
+
+    def is_current(self, key: str, source_path: str, destination_path: str,
+                   stat: Optional[os.stat_result] = None) -> bool:
+        """
+        Check whether the destination already holds the current content of a source file.
+
+        Args:
+            key: Manifest key of the file (its path relative to the source folder)
+            source_path: Path of the source file
+            destination_path: Path the file is copied to
+            stat: Already known os.stat() result of source_path
+
+        Returns:
+            True if copying the file again can be skipped
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return self.adopt_existing(key, source_path, destination_path, stat)
+        if not os.path.exists(destination_path):
+            return False
+        if stat is None:
+            stat = os.stat(source_path)
+        if entry["size"] != stat.st_size:
+            return False
+        if entry["mtime_ns"] == stat.st_mtime_ns:
+            return True
+        if not self.use_hash or not entry.get("hash"):
+            return False
+        if file_hash(source_path) != entry["hash"]:
+            return False
+        # Same content with a new timestamp: remember it so the hash is not recomputed
+        self.record(key, stat, entry["hash"])
+        return True
+
+    def adopt_existing(self, key: str, source_path: str, destination_path: str,
+                       stat: Optional[os.stat_result] = None) -> bool:
+        """
+        Record a file missing from the manifest if the destination already holds a copy of it.
+
+        Copies keep the source's modification time (copystat), so a destination
+        file with the same size and modification time is taken as current, e.g.
+        on the first start with a manifest or after the manifest was lost.
+
+        Returns:
+            True if the copy matches and was recorded
+        """
+        try:
+            destination_stat = os.stat(destination_path)
+        except OSError:
+            return False
+        if stat is None:
+            stat = os.stat(source_path)
+        if (destination_stat.st_size, destination_stat.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            return False
+        self.record(key, stat)
+        return True
+
+    def record(self, key: str, stat: os.stat_result, content_hash: Optional[str] = None,
+               method: Optional[str] = None) -> None:
+        """
+        Remember the state of a source file that has just been copied.
+
+        Args:
+            key: Manifest key of the file
+            stat: os.stat() result of the source taken before copying
+            content_hash: Content hash of the source, if computed
+            method: Copy method that produced the destination file
+        """
+        with self._lock:
+            if method is None:
+                method = self.entries.get(key, {}).get("method")
+            self.entries[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": content_hash,
+                                 "method": method}
+            self._dirty = True
+
+    def forget(self, key: str) -> None:
+        """Drop the entry for a file, or for every file below it if key is a folder."""
+        prefix = key + os.sep
+        with self._lock:
+            stale = [k for k in self.entries if k == key or k.startswith(prefix)]
+            for k in stale:
+                del self.entries[k]
+            if stale:
+                self._dirty = True
+
+    def rename(self, old_key: str, new_key: str) -> None:
+        """Move the entry for a file, or for every file below it if old_key is a folder."""
+        prefix = old_key + os.sep
+        with self._lock:
+            moved = [k for k in self.entries if k == old_key or k.startswith(prefix)]
+            for k in moved:
+                self.entries[new_key + k[len(old_key):]] = self.entries.pop(k)
+            if moved:
+                self._dirty = True
+
+
+def scan_files(source_path: str, recursive: bool = False) -> Iterator[os.DirEntry]:
+    """
+    Yield the regular files inside source_path.
+
+    Args:
+        source_path: Folder to scan
+        recursive: Also yield files in subfolders
+    """
+    pending = [source_path]
+    while pending:
+        try:
+            it = os.scandir(pending.pop())
+        except OSError:
+            # The folder disappeared or is unreadable
+            continue
+        with it:
+            for entry in it:
+                if entry.is_file():
+                    yield entry
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+
+
+def reconcile(source_path: str, destination_path: str, manifest: CopyManifest,
+              recursive: bool = False, accept: Optional[Callable[[str], bool]] = None) -> List[str]:
+    """
+    Find the source files that changed since they were last copied.
+
+    Args:
+        source_path: Folder being monitored
+        destination_path: Folder files are copied to
+        manifest: Manifest of previously copied files
+        recursive: Include subfolders, keyed by their path relative to source_path
+        accept: Called with each file's path relative to source_path; files it
+            rejects are skipped
+
+    Returns:
+        Paths of the source files that need to be copied
+    """
+    changed = []
+    for entry in scan_files(source_path, recursive):
+        key = os.path.relpath(entry.path, source_path)
+        if accept is not None and not accept(key):
+            continue
+        destination_file_path = os.path.join(destination_path, key)
+        try:
+            if not manifest.is_current(key, entry.path, destination_file_path, entry.stat()):
+                changed.append(entry.path)
+        except OSError:
+            # The file disappeared while scanning
+            continue
+    return changed
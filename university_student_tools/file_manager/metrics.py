@@ -0,0 +1,200 @@
+"""
+Module for collecting copy pipeline metrics and exporting them as JSON and Prometheus text
+"""
+
+import bisect
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Sequence
+
+from .manifest import write_json_atomic
+
+# Upper bounds, in seconds, of the event-to-copy latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+PROMETHEUS_PREFIX = "copy_files"
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds, in the Prometheus layout."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        # One count per bound plus the +Inf bucket, not cumulative until exported
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        """Get the number of observations at or below each bound, ending with +Inf."""
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+class CopyMetrics:
+    """
+    Counters and histograms describing the copy pipeline.
+
+    Copies, retries and failures are recorded by the handler as they happen;
+    the metrics are written to a JSON file and a Prometheus text file (for
+    node_exporter's textfile collector) every interval seconds, each replaced
+    atomically so readers never see a partial file.
+    """
+
+    def __init__(self, metrics_dir: str, interval: float = 10.0):
+        """
+        Initialize the metrics.
+
+        Args:
+            metrics_dir: Folder the copy_files.json and copy_files.prom files are written to
+            interval: Seconds between two exports
+        """
+        self.json_path = os.path.join(metrics_dir, f"{PROMETHEUS_PREFIX}.json")
+        self.prometheus_path = os.path.join(metrics_dir, f"{PROMETHEUS_PREFIX}.prom")
+        self.interval = interval
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.copies: Counter = Counter()
+        self.bytes_copied = 0
+        self.copy_seconds = 0.0
+        self.retries = 0
+        self.failures = 0
+        self.queue_depth = 0
+        self.throughput = 0.0
+        self._started = time.time()
+        self._lock = threading.Lock()
+        self._last_export = time.monotonic()
+        self._bytes_at_last_export = 0
+
+    def record_copy(self, method: str, latency: float, size: int, duration: float) -> None:
+        """
+        Record a completed copy into one destination.
+
+        Args:
+            method: Copy method used
+            latency: Seconds between the last event for the file and the end of the copy
+            size: Bytes written
+            duration: Seconds spent copying
+        """
+        with self._lock:
+            self.latency.observe(latency)
+            self.copies[method] += 1
+            self.bytes_copied += size
+            self.copy_seconds += duration
+
+    def record_retry(self, count: int = 1) -> None:
+        """Record copies being attempted again."""
+        with self._lock:
+            self.retries += count
+
+    def record_failure(self) -> None:
+        """Record a failed copy attempt."""
+        with self._lock:
+            self.failures += 1
+
+    def export_if_due(self, queue_depth: int) -> None:
+        """Write the metrics files if interval seconds passed since the last export."""
+        if time.monotonic() - self._last_export >= self.interval:
+            self.export(queue_depth)
+
+    def export(self, queue_depth: int) -> None:
+        """
+        Write the metrics files.
+
+        Args:
+            queue_depth: Number of copies currently waiting for a worker
+        """
+        now = time.monotonic()
+        with self._lock:
+            elapsed = now - self._last_export
+            if elapsed > 0:
+                self.throughput = (self.bytes_copied - self._bytes_at_last_export) / elapsed
+            self._last_export = now
+            self._bytes_at_last_export = self.bytes_copied
+            self.queue_depth = queue_depth
+            snapshot = self.snapshot()
+        try:
+            write_json_atomic(self.json_path, snapshot)
+            self._write_prometheus(snapshot)
+        except OSError as e:
+            print(f"Failed to write metrics to '{os.path.dirname(self.json_path)}': {e}")
+
+    def snapshot(self) -> dict:
+        """Get the current metrics as a JSON-serialisable dictionary; call with the lock held."""
+        return {
+            "version": 1,
+            "started": self._started,
+            "updated": time.time(),
+            "copies": dict(self.copies),
+            "bytes_copied": self.bytes_copied,
+            "copy_seconds": self.copy_seconds,
+            "throughput_bytes_per_second": self.throughput,
+            "average_bytes_per_second": self.bytes_copied / self.copy_seconds if self.copy_seconds else 0.0,
+            "retries": self.retries,
+            "failures": self.failures,
+            "queue_depth": self.queue_depth,
+            "latency_seconds": {
+                "buckets": dict(zip([str(b) for b in self.latency.bounds] + ["+Inf"], self.latency.cumulative())),
+                "sum": self.latency.sum,
+                "count": self.latency.count,
+            },
+        }
+
+    def _write_prometheus(self, snapshot: dict) -> None:
+        """Write a snapshot in the Prometheus text exposition format."""
+        name = PROMETHEUS_PREFIX
+        lines = [
+            f"# HELP {name}_copy_latency_seconds Time from the last event for a file to its completed copy.",
+            f"# TYPE {name}_copy_latency_seconds histogram",
+        ]
+        latency = snapshot["latency_seconds"]
+        for bound, count in latency["buckets"].items():
+            lines.append(f'{name}_copy_latency_seconds_bucket{{le="{bound}"}} {count}')
+        lines.append(f"{name}_copy_latency_seconds_sum {latency['sum']}")
+        lines.append(f"{name}_copy_latency_seconds_count {latency['count']}")
+
+        lines.append(f"# HELP {name}_copies_total Completed copies by copy method.")
+        lines.append(f"# TYPE {name}_copies_total counter")
+        for method, count in sorted(snapshot["copies"].items()):
+            lines.append(f'{name}_copies_total{{method="{method}"}} {count}')
+
+        metrics = [
+            ("bytes_copied_total", "counter", "Bytes written into destinations.", snapshot["bytes_copied"]),
+            ("copy_seconds_total", "counter", "Seconds spent copying.", snapshot["copy_seconds"]),
+            ("throughput_bytes_per_second", "gauge", "Bytes copied per second since the previous export.",
+             snapshot["throughput_bytes_per_second"]),
+            ("retries_total", "counter", "Copies attempted again after a failure.", snapshot["retries"]),
+            ("failures_total", "counter", "Failed copy attempts.", snapshot["failures"]),
+            ("queue_depth", "gauge", "Copies waiting for a worker.", snapshot["queue_depth"]),
+        ]
+        for metric, kind, description, value in metrics:
+            lines.append(f"# HELP {name}_{metric} {description}")
+            lines.append(f"# TYPE {name}_{metric} {kind}")
+            lines.append(f"{name}_{metric} {value}")
+
+        tmp_path = f"{self.prometheus_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.prometheus_path)
+
+    def summary(self) -> Dict[str, float]:
+        """Get the headline numbers printed on exit."""
+        with self._lock:
+            count = self.latency.count
+            return {
+                "copies": count,
+                "bytes": self.bytes_copied,
+                "bytes_per_second": self.bytes_copied / self.copy_seconds if self.copy_seconds else 0.0,
+                "average_latency": self.latency.sum / count if count else 0.0,
+                "retries": self.retries,
+                "failures": self.failures,
+            }
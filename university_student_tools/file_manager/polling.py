@@ -0,0 +1,285 @@
+"""
+Module for watching folders by polling, for mounts that deliver no file system events
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+from watchdog.events import (DirCreatedEvent, DirDeletedEvent, DirMovedEvent, FileCreatedEvent,
+                             FileDeletedEvent, FileModifiedEvent, FileMovedEvent,
+                             FileSystemEvent, FileSystemEventHandler)
+
+# (inode, is_dir, size, mtime_ns) of one directory entry
+Entry = Tuple[int, bool, int, int]
+
+
+class SnapshotPoller:
+    """
+    Detect changes in a folder by diffing os.scandir() snapshots.
+
+    SMB/NFS mounts and cloud-sync folders often deliver no inotify-style
+    events. The poller keeps an in-memory index of every directory it watches
+    and rescans the tree incrementally: each poll reads directories in
+    round-robin order until max_entries entries have been checked, so the
+    cost of one poll stays bounded however large the tree is. A directory
+    with more entries than that is read across several polls from the same
+    os.scandir() iterator; its new and modified entries are reported as they
+    are read, its deleted entries once the whole directory has been read.
+    Differences are dispatched to the handler as regular watchdog events,
+    and entries that disappear from one place and reappear elsewhere in the
+    same poll (same inode) are reported as moves.
+
+    The poller has the start/stop/join interface of a watchdog Observer.
+    """
+
+    def __init__(self, handler: FileSystemEventHandler, path: str, recursive: bool = False,
+                 interval: float = 2.0, max_entries: int = 10000):
+        """
+        Initialize the poller.
+
+        Args:
+            handler: Receives the detected events through handler.dispatch()
+            path: Folder to watch
+            recursive: Also watch subfolders
+            interval: Seconds between two polls
+            max_entries: Directory entries checked per poll; a full pass over
+                larger trees is spread over several polls
+        """
+        self.handler = handler
+        self.path = path
+        self.recursive = recursive
+        self.interval = interval
+        self.max_entries = max(1, max_entries)
+        self._index: Dict[str, Dict[str, Entry]] = {}
+        self._queue: Deque[str] = deque()
+        # Directory being read across polls: its path, scandir iterator and the entries read so far
+        self._scan: Optional[Tuple[str, Iterator[os.DirEntry], Dict[str, Entry]]] = None
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="SnapshotPoller", daemon=True)
+
+    @property
+    def entry_count(self) -> int:
+        """Number of directory entries in the index."""
+        return sum(len(entries) for entries in self._index.values())
+
+    def start(self) -> None:
+        """Take the initial snapshot and start polling in the background."""
+        self._index[self.path] = {}
+        pending = deque([self.path])
+        while pending:
+            directory = pending.popleft()
+            entries = self._list(directory)
+            if entries is None:
+                continue
+            self._index[directory] = entries
+            pending.extend(os.path.join(directory, name) for name, entry in entries.items() if entry[1])
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Ask the polling thread to stop."""
+        self._stop_event.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the polling thread to finish."""
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        """Poll until stopped, keeping the thread alive on errors."""
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"An error occurred while polling '{self.path}': {e}")
+        self._close_scan()
+
+    def _list(self, directory: str) -> Optional[Dict[str, Entry]]:
+        """
+        Read the entries of one directory.
+
+        Subfolders are only included in recursive mode, and symbolic links to
+        folders are treated as files so they are never followed.
+
+        Returns:
+            Mapping of entry names to their snapshot, or None if the
+            directory could not be read
+        """
+        entries = {}
+        try:
+            with os.scandir(directory) as iterator:
+                for dir_entry in iterator:
+                    entry = self._read_entry(dir_entry)
+                    if entry is not None:
+                        entries[dir_entry.name] = entry
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"Could not read '{directory}': {e}")
+            return None
+        return entries
+
+    def _read_entry(self, dir_entry: os.DirEntry) -> Optional[Entry]:
+        """
+        Snapshot one directory entry.
+
+        Returns:
+            The entry's snapshot, or None if it is skipped: a subfolder in
+            non-recursive mode, or an entry removed while it was being read
+        """
+        try:
+            is_dir = dir_entry.is_dir(follow_symlinks=False)
+            if is_dir and not self.recursive:
+                return None
+            if is_dir:
+                return dir_entry.inode(), True, 0, 0
+            stat = dir_entry.stat(follow_symlinks=False)
+            return stat.st_ino, False, stat.st_size, stat.st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _close_scan(self) -> None:
+        """Abandon the directory being read, if any."""
+        if self._scan is not None:
+            iterator = self._scan[1]
+            self._scan = None
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    def poll(self) -> None:
+        """Read the next max_entries directory entries and dispatch the changes found."""
+        if self._scan is None and not self._queue:
+            self._queue.extend(self._index)
+
+        created: List[Tuple[str, Entry]] = []
+        deleted: List[Tuple[str, Entry]] = []
+        modified: List[str] = []
+        budget = self.max_entries
+        while budget > 0:
+            if self._scan is None:
+                if not self._queue:
+                    break
+                directory = self._queue.popleft()
+                if directory not in self._index:
+                    # Removed or moved earlier in this pass
+                    continue
+                try:
+                    self._scan = (directory, os.scandir(directory), {})
+                except FileNotFoundError:
+                    if directory == self.path:
+                        return
+                    # The parent's next scan reports the deletion
+                    continue
+                except OSError as e:
+                    print(f"Could not read '{directory}': {e}")
+                    continue
+                # Opening a directory costs about as much as reading an entry
+                budget -= 1
+
+            directory, iterator, new_entries = self._scan
+            old_entries = self._index.get(directory)
+            if old_entries is None:
+                # Deleted or moved while it was being read
+                self._close_scan()
+                continue
+            finished = False
+            try:
+                while budget > 0:
+                    dir_entry = next(iterator, None)
+                    if dir_entry is None:
+                        finished = True
+                        break
+                    budget -= 1
+                    entry = self._read_entry(dir_entry)
+                    if entry is None:
+                        continue
+                    new_entries[dir_entry.name] = entry
+                    path = os.path.join(directory, dir_entry.name)
+                    old = old_entries.get(dir_entry.name)
+                    if old is None:
+                        created.append((path, entry))
+                    elif old[1] != entry[1]:
+                        # A file replaced by a folder or the other way round
+                        deleted.append((path, old))
+                        created.append((path, entry))
+                    elif not entry[1] and (old[0], old[2], old[3]) != (entry[0], entry[2], entry[3]):
+                        modified.append(path)
+            except OSError as e:
+                # Read again from the start on its next turn
+                print(f"Could not read '{directory}': {e}")
+                self._close_scan()
+                continue
+            if not finished:
+                # Out of budget: the next poll resumes this directory
+                break
+
+            self._close_scan()
+            for name, old in old_entries.items():
+                if name not in new_entries:
+                    deleted.append((os.path.join(directory, name), old))
+            self._index[directory] = new_entries
+
+        for event in self._diff(created, deleted, modified):
+            self.handler.dispatch(event)
+
+    def _diff(self, created: List[Tuple[str, Entry]], deleted: List[Tuple[str, Entry]],
+              modified: List[str]) -> List[FileSystemEvent]:
+        """
+        Turn the changes of one poll into events and update the index of folders.
+
+        Returns:
+            Moves first, then deletions, creations and modifications
+        """
+        # Inode 0 means the file system does not report inode numbers
+        deleted_by_inode = {entry[0]: path for path, entry in deleted if entry[0]}
+        moves: List[FileSystemEvent] = []
+        moved_from = set()
+        moved_to = set()
+        for path, entry in created:
+            old_path = deleted_by_inode.get(entry[0]) if entry[0] else None
+            if old_path is None or old_path in moved_from:
+                continue
+            moved_from.add(old_path)
+            moved_to.add(path)
+            if entry[1]:
+                self._rename_folder(old_path, path)
+                moves.append(DirMovedEvent(old_path, path))
+            else:
+                moves.append(FileMovedEvent(old_path, path))
+
+        events = moves
+        for path, entry in deleted:
+            if path in moved_from:
+                continue
+            if entry[1]:
+                self._forget_folder(path)
+                events.append(DirDeletedEvent(path))
+            else:
+                events.append(FileDeletedEvent(path))
+        for path, entry in created:
+            if path in moved_to:
+                continue
+            if entry[1]:
+                # Scanned next, so every entry inside is reported as created
+                self._index[path] = {}
+                self._queue.appendleft(path)
+                events.append(DirCreatedEvent(path))
+            else:
+                events.append(FileCreatedEvent(path))
+        events.extend(FileModifiedEvent(path) for path in modified)
+        return events
+
+    def _subfolders(self, folder: str) -> List[str]:
+        """Get a folder and every folder below it in the index."""
+        prefix = folder + os.sep
+        return [directory for directory in self._index if directory == folder or directory.startswith(prefix)]
+
+    def _forget_folder(self, folder: str) -> None:
+        """Drop a deleted folder and everything below it from the index."""
+        for directory in self._subfolders(folder):
+            del self._index[directory]
+
+    def _rename_folder(self, old_folder: str, new_folder: str) -> None:
+        """Move the index of a moved folder and everything below it to its new path."""
+        for directory in self._subfolders(old_folder):
+            self._index[new_folder + directory[len(old_folder):]] = self._index.pop(directory)
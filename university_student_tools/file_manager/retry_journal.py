@@ -0,0 +1,157 @@
+"""
+Module for persisting failed copies and retrying them in the background
+"""
+
+import heapq
+import json
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from .manifest import write_json_atomic
+
+
+class RetryJournal:
+    """
+    On-disk journal of failed copies, replayed with exponential backoff.
+
+    Each entry is a (source file, destination folder) pair. Entries survive
+    restarts and are replayed from a background thread, so failures never
+    block the handling of new events.
+    """
+
+    def __init__(self, journal_path: str, replay: Callable[[str, List[str]], None],
+                 base_delay: float = 1.0, max_delay: float = 300.0, warn_after: int = 3):
+        """
+        Initialize the journal, loading pending entries from disk.
+
+        Args:
+            journal_path: JSON file the journal is persisted to
+            replay: Called as replay(file_path, destination_paths) when entries are due
+            base_delay: Delay before the first retry, in seconds; doubled after every failure
+            max_delay: Longest delay between two retries, in seconds
+            warn_after: Number of failed attempts after which a warning is printed
+        """
+        self.journal_path = journal_path
+        self.replay = replay
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.warn_after = warn_after
+        self.entries: Dict[Tuple[str, str], dict] = {}
+        self._due: List[Tuple[float, str, str]] = []
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="RetryJournal", daemon=True)
+        self.load()
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self.entries)
+
+    def load(self) -> None:
+        """Load entries from disk, starting empty if the file is missing or corrupt."""
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("entries", [])
+        except FileNotFoundError:
+            entries = []
+        except (ValueError, OSError) as e:
+            print(f"Ignoring unreadable retry journal '{self.journal_path}': {e}")
+            entries = []
+
+        with self._condition:
+            for entry in entries:
+                key = (entry["source"], entry["destination"])
+                self.entries[key] = entry
+                heapq.heappush(self._due, (entry["next_attempt"], *key))
+        if entries:
+            print(f"Retry journal: {len(entries)} failed copy(ies) pending from a previous run")
+
+    def save(self) -> None:
+        """Write the journal to disk."""
+        with self._condition:
+            data = {"version": 1, "entries": list(self.entries.values())}
+        try:
+            write_json_atomic(self.journal_path, data)
+        except OSError as e:
+            print(f"Failed to save retry journal '{self.journal_path}': {e}")
+
+    def start(self) -> None:
+        """Start the background replay thread."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the replay thread and persist pending entries."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.save()
+
+    def add_failure(self, file_path: str, destination_path: str, error: BaseException) -> None:
+        """
+        Record a failed copy and schedule its next attempt.
+
+        Args:
+            file_path: Source file that failed to copy
+            destination_path: Destination folder the copy failed for
+            error: The error that occurred
+        """
+        key = (file_path, destination_path)
+        with self._condition:
+            entry = self.entries.get(key) or {"source": file_path, "destination": destination_path, "attempts": 0}
+            entry["attempts"] += 1
+            delay = min(self.base_delay * 2 ** (entry["attempts"] - 1), self.max_delay)
+            entry["next_attempt"] = time.time() + delay
+            entry["error"] = str(error)
+            self.entries[key] = entry
+            heapq.heappush(self._due, (entry["next_attempt"], *key))
+            self._condition.notify()
+        self.save()
+
+        if entry["attempts"] == self.warn_after:
+            print(f"Copy of '{file_path}' to '{destination_path}' has failed {entry['attempts']} times; "
+                  f"still retrying in the background")
+        else:
+            print(f"Will retry copying '{file_path}' to '{destination_path}' in {delay:.1f}s")
+
+    def resolve(self, file_path: str, destination_path: str) -> None:
+        """Drop the entry for a copy that succeeded or is no longer needed."""
+        with self._condition:
+            removed = self.entries.pop((file_path, destination_path), None)
+        if removed is not None:
+            self.save()
+
+    def _pop_due(self, now: float) -> Dict[str, List[str]]:
+        """Remove due heap entries, grouping their destinations by source file."""
+        due: Dict[str, List[str]] = {}
+        while self._due and self._due[0][0] <= now:
+            next_attempt, file_path, destination_path = heapq.heappop(self._due)
+            entry = self.entries.get((file_path, destination_path))
+            # Stale heap entries are left behind by resolved or rescheduled copies
+            if entry is not None and entry["next_attempt"] == next_attempt:
+                due.setdefault(file_path, []).append(destination_path)
+        return due
+
+    def _run(self) -> None:
+        """Wait for entries to become due and replay them."""
+        while True:
+            with self._condition:
+                while not self._stopping:
+                    if not self._due:
+                        self._condition.wait()
+                        continue
+                    delay = self._due[0][0] - time.time()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                if self._stopping:
+                    return
+                due = self._pop_due(time.time())
+
+            for file_path, destination_paths in due.items():
+                try:
+                    self.replay(file_path, destination_paths)
+                except Exception as e:
+                    print(f"An error occurred while retrying '{file_path}': {e}")
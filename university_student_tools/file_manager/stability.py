@@ -0,0 +1,49 @@
+"""
+Module for detecting when a file has finished being written
+"""
+
+import os
+import time
+from typing import Optional
+
+
+def wait_until_stable(file_path: str, initial_delay: float = 0.05, max_delay: float = 2.0,
+                      timeout: float = 600.0) -> Optional[os.stat_result]:
+    """
+    Wait until a file's size and modification time stop changing.
+
+    The file is polled with an adaptive backoff: small files that are already
+    complete are accepted after one short delay, while the delay doubles (up
+    to max_delay) for as long as the file keeps growing.
+
+    Args:
+        file_path: File to watch
+        initial_delay: First delay between two polls, in seconds
+        max_delay: Longest delay between two polls, in seconds
+        timeout: Give up after this many seconds of continuous changes
+
+    Returns:
+        The stable os.stat() result, or None if the file disappeared
+
+    Raises:
+        TimeoutError: If the file was still changing after timeout seconds
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    try:
+        previous = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+
+    while True:
+        time.sleep(delay)
+        try:
+            current = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        if (current.st_size, current.st_mtime_ns) == (previous.st_size, previous.st_mtime_ns):
+            return current
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"'{file_path}' was still being written after {timeout:.0f}s")
+        previous = current
+        delay = min(delay * 2, max_delay)
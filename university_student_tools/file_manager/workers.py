@@ -0,0 +1,140 @@
+"""
+Module providing a bounded worker pool for running copy jobs off the observer thread
+"""
+
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+Job = Tuple[Callable[..., None], tuple]
+
+
+class CopyWorkerPool:
+    """
+    Run jobs on a fixed set of worker threads.
+
+    Jobs wait in one shared queue and run on whichever worker is free. Jobs
+    sharing a key (the same file) are chained: each one is only queued once
+    the previous job for its key has finished, so they run in submission
+    order, and a slow job (e.g. waiting for a recording to be fully written)
+    only holds up later jobs for the same file.
+    """
+
+    def __init__(self, workers: int = 4, max_queue_size: int = 256):
+        """
+        Initialize the pool.
+
+        Args:
+            workers: Number of worker threads
+            max_queue_size: Maximum number of jobs waiting to run; submit
+                blocks while that many are waiting
+        """
+        self.workers = max(1, workers)
+        self.max_queue_size = max(1, max_queue_size)
+        self._ready: Deque[Tuple[str, Job]] = deque()
+        # Jobs chained behind the queued or running job of their key; a key is present while it has one
+        self._chains: Dict[str, Deque[Job]] = {}
+        self._waiting = 0
+        self._active = 0
+        self._closing = False
+        self._condition = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"CopyWorker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting to run, excluding those currently running."""
+        with self._condition:
+            return self._waiting
+
+    @property
+    def active_count(self) -> int:
+        """Number of jobs currently running."""
+        with self._condition:
+            return self._active
+
+    def start(self) -> None:
+        """Start the worker threads."""
+        for thread in self._threads:
+            thread.start()
+
+    def is_alive(self) -> bool:
+        """Check whether any worker is still running, e.g. after stop(wait=False)."""
+        return any(thread.is_alive() for thread in self._threads)
+
+    def submit(self, key: str, func: Callable[..., None], *args) -> None:
+        """
+        Queue a job.
+
+        Args:
+            key: Ordering key; jobs with equal keys never run concurrently
+            func: Callable to run
+            *args: Arguments passed to func
+        """
+        with self._condition:
+            while self._waiting >= self.max_queue_size:
+                self._condition.wait()
+            self._waiting += 1
+            chain = self._chains.get(key)
+            if chain is not None:
+                chain.append((func, args))
+            else:
+                self._chains[key] = deque()
+                self._ready.append((key, (func, args)))
+                self._condition.notify_all()
+
+    def stop(self, wait: bool = True) -> None:
+        """
+        Stop the workers once their queued jobs have run.
+
+        Args:
+            wait: Block until all workers have exited
+        """
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                if thread.is_alive():
+                    thread.join()
+
+    def _next_job(self) -> Optional[Tuple[str, Job]]:
+        """Wait for a job to run, or return None once the pool is stopped and drained."""
+        with self._condition:
+            while not self._ready:
+                if self._closing and self._waiting == 0:
+                    return None
+                self._condition.wait()
+            key, job = self._ready.popleft()
+            self._waiting -= 1
+            self._active += 1
+            # Room for a blocked submit
+            self._condition.notify_all()
+            return key, job
+
+    def _finish(self, key: str) -> None:
+        """Queue the next job chained behind a finished one, if any."""
+        with self._condition:
+            self._active -= 1
+            chain = self._chains[key]
+            if chain:
+                self._ready.append((key, chain.popleft()))
+            else:
+                del self._chains[key]
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        """Worker loop: run jobs until the pool is stopped and no job is left."""
+        while True:
+            next_job = self._next_job()
+            if next_job is None:
+                return
+            key, (func, args) = next_job
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"An error occurred in a copy worker: {e}")
+            finally:
+                self._finish(key)
@@ -0,0 +1,151 @@
+"""
+Module providing a shared asyncio runtime the monitors run on as tasks
+"""
+
+import asyncio
+import signal
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+
+async def every(interval: float, callback: Callable[..., Any], *args) -> None:
+    """
+    Call callback(*args) every interval seconds until cancelled.
+
+    Errors raised by the callback are printed and do not stop the timer.
+
+    Args:
+        interval: Seconds between two calls
+        callback: Function to call; coroutine functions are awaited
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            result = callback(*args)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            print(f"An error occurred in a timer: {e}")
+
+
+async def run_blocking(func: Callable[..., Any], *args) -> Any:
+    """Run a blocking function on the default thread pool without stalling the event loop."""
+    return await asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+
+class MonitorRuntime:
+    """
+    Run several monitors as tasks of one event loop.
+
+    Each monitor is a coroutine that runs until cancelled and releases its
+    resources in a finally block. SIGINT and SIGTERM (or Ctrl+C on Windows)
+    cancel every monitor and wait for their cleanup; a second one cancels
+    them again, interrupting cleanup that waits for pending work. A monitor
+    that fails is reported without stopping the others. Signals are only
+    handled when the runtime runs on the main thread; elsewhere use stop().
+    """
+
+    def __init__(self):
+        self._monitors: List[Tuple[str, Awaitable[None]]] = []
+        self._tasks: List[asyncio.Future] = []
+        self._stopping: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def add(self, name: str, monitor: Awaitable[None]) -> None:
+        """
+        Register a monitor to run.
+
+        Args:
+            name: Name used when reporting the monitor's errors
+            monitor: Coroutine running the monitor
+        """
+        self._monitors.append((name, monitor))
+
+    def stop(self) -> None:
+        """Ask every monitor to stop, or to stop waiting if already asked; safe to call from any thread."""
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._request_stop)
+
+    def _request_stop(self) -> None:
+        """Cancel the monitors, cancelling them again if they are already stopping."""
+        if not self._stopping.is_set():
+            self._stopping.set()
+            return
+        print("Stopping without waiting for pending work...")
+        for task in self._tasks:
+            task.cancel()
+
+    def run(self) -> None:
+        """Run the registered monitors until all finish or a stop is requested."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._main())
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            asyncio.set_event_loop(None)
+            self._loop = None
+            loop.close()
+
+    def _install_signal_handlers(self) -> List[Tuple[int, Any]]:
+        """Make SIGINT and SIGTERM stop the runtime, returning the handlers to restore."""
+        restore = []
+        for signum in (signal.SIGINT, getattr(signal, "SIGTERM", None)):
+            if signum is None:
+                continue
+            try:
+                self._loop.add_signal_handler(signum, self._request_stop)
+                restore.append((signum, None))
+            except ValueError:
+                # Not on the main thread: signals cannot be handled here at all
+                break
+            except (NotImplementedError, RuntimeError):
+                # Windows event loops have no add_signal_handler
+                try:
+                    previous = signal.signal(signum, lambda *_: self.stop())
+                except ValueError:
+                    break
+                restore.append((signum, previous))
+        return restore
+
+    def _restore_signal_handlers(self, restore: List[Tuple[int, Any]]) -> None:
+        for signum, previous in restore:
+            if previous is None:
+                self._loop.remove_signal_handler(signum)
+            else:
+                signal.signal(signum, previous)
+
+    async def _main(self) -> None:
+        self._stopping = asyncio.Event()
+        restore = self._install_signal_handlers()
+        tasks = {asyncio.ensure_future(monitor): name for name, monitor in self._monitors}
+        self._tasks = list(tasks)
+        self._monitors = []
+        stopper = asyncio.ensure_future(self._stopping.wait())
+        try:
+            pending = set(tasks)
+            while pending and not self._stopping.is_set():
+                done, pending = await asyncio.wait(pending | {stopper}, return_when=asyncio.FIRST_COMPLETED)
+                pending.discard(stopper)
+                for task in done - {stopper}:
+                    if not task.cancelled() and task.exception() is not None:
+                        print(f"Monitor '{tasks[task]}' stopped: {task.exception()}")
+        finally:
+            for task in list(tasks) + [stopper]:
+                task.cancel()
+            await asyncio.gather(*tasks, stopper, return_exceptions=True)
+            self._tasks = []
+            self._restore_signal_handlers(restore)
+
+
+def run_monitors(*monitors: Awaitable[None]) -> None:
+    """
+    Run monitor coroutines on one shared event loop until interrupted.
+
+    Args:
+        *monitors: Coroutines such as watch_directory(...) and watch_clipboard(...)
+    """
+    runtime = MonitorRuntime()
+    for index, monitor in enumerate(monitors):
+        runtime.add(getattr(monitor, "__name__", f"monitor-{index}"), monitor)
+    runtime.run()